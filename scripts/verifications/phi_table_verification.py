@@ -0,0 +1,75 @@
+"""
+Compare the phi lookup tables against the exact phi and against the inverse given by pynverse's inversefunc,
+which DEGA used before the tables.
+
+Created on 18/10/2026 11:20
+"""
+
+import time
+
+import numpy as np
+from pynverse import inversefunc
+
+from tcc.coding.polarcoding.construction.construction import phi, PhiTable, dega
+
+
+def scalar_phi(x):
+    if 10 > x >= 0:
+        out = np.exp(-0.4527 * x ** 0.86 + 0.0218)
+
+    elif x >= 10:
+        out = np.sqrt(np.pi / x) * np.exp(- x / 4) * (1 - 10 / (7 * x))
+
+    else:
+        out = 0
+
+    return out
+
+
+inversefunc_iphi = inversefunc(scalar_phi, domain=0, open_domain=[True, False])
+
+# phi is not monotone right after x = 10, so that region is left out; above x = 200 the inversefunc minimization
+# no longer converges on the tiny values of phi
+x = np.concatenate((np.geomspace(1e-3, 9.9, 500), np.geomspace(10.1, 200, 500)))
+y = phi(x)
+x_reference = np.array([float(inversefunc_iphi(value)) for value in y])
+
+# Relative accuracy of the inversefunc reference itself
+reference_error = 2e-8
+assert np.max(np.abs(x_reference - x) / x) < reference_error
+
+# Right after the step of phi, the inverse follows the flat envelope up to the next table sample
+after_step = (x > 10) & (x < 11)
+
+reference_table = PhiTable(2 ** 20)
+
+for num_points in [2 ** 10, 2 ** 12, 2 ** 14, 2 ** 16, 2 ** 18]:
+    table = PhiTable(num_points)
+
+    # Linear interpolation of log(phi) on a geometric grid, so the error falls with the square of the log spacing,
+    # except after the step, where it falls with the spacing itself
+    log_step = np.log(table.x[-1] / table.x[1]) / num_points
+    tolerance = 0.1 * log_step ** 2
+    step_tolerance = log_step
+
+    phi_error = np.max(np.abs(table.phi(x) - phi(x)) / phi(x))
+    iphi_errors = np.abs(table.iphi(y) - x_reference) / x_reference
+    iphi_error = np.max(iphi_errors[~after_step])
+    iphi_step_error = np.max(iphi_errors[after_step])
+
+    assert phi_error < tolerance, (num_points, phi_error, tolerance)
+    assert iphi_error < tolerance + reference_error, (num_points, iphi_error, tolerance + reference_error)
+    assert iphi_step_error < step_tolerance, (num_points, iphi_step_error, step_tolerance)
+
+    rel_idx, parameters = dega(10, 1.0, table)
+    rel_idx_ref, parameters_ref = dega(10, 1.0, reference_table)
+
+    # Differences are expected only among nearly tied channels
+    print("{} points: phi relative error {:.2e}, iphi relative error {:.2e} (tolerance {:.2e}), after the step "
+          "{:.2e} (tolerance {:.2e}), dega ordering differences: {}".format(
+              num_points, phi_error, iphi_error, tolerance, iphi_step_error, step_tolerance,
+              np.sum(rel_idx != rel_idx_ref)))
+
+start = time.time()
+dega(16, np.arange(-2, 6, 0.5))
+print("dega, n = 16, 16 design SNRs: {:.3f} s".format(time.time() - start))
@@ -28,13 +28,35 @@ class CRC:
 
         self.crc_len = crc_setup[-1]
         self.len_bit = 8 * self.crc_len
-        self.crc_fun = crcmod.mkCrcFun(*crc_setup[:-1])
+
+        # The configurations are not reflected, so the register shifts to the left a byte at a time, through the
+        # table of crcmod, over every message of a batch at once
+        crc = crcmod.Crc(*crc_setup[:-1])
+        self.table = np.array(crc.table, dtype=np.uint64)
+        self.init = np.uint64(crc.initCrc ^ crc.xorOut)
+        self.xor_out = np.uint64(crc.xorOut)
+        self.mask = np.uint64(2 ** self.len_bit - 1)
+        self.bit_shifts = np.arange(self.len_bit - 1, -1, -1, dtype=np.uint64)
 
     def __call__(self, bits):
-        bytes_int = np.packbits(bits)
-        crc_int = self.crc_fun(bytes_int)
-        crc_bytes = crc_int.to_bytes(self.crc_len, 'big')
-        crc_array = np.frombuffer(crc_bytes, dtype=np.uint8)
-        crc_bits = np.unpackbits(crc_array)
+        """
+        Compute the CRC bits
+
+        :param bits: array of 0's and 1's, either a single message (size, ) or a batch of messages (messages, size)
+        :return: CRC bits, shaped (len_bit, ) or (messages, len_bit)
+        """
+
+        if bits.ndim == 1:
+            return self(bits[np.newaxis, :])[0]
+
+        message_bytes = np.packbits(bits, axis=-1).astype(np.uint64)
+
+        register = np.full(bits.shape[0], self.init, dtype=np.uint64)
+        top_shift = np.uint64(self.len_bit - 8)
+        for column in message_bytes.T:
+            index = ((register >> top_shift) ^ column) & np.uint64(0xFF)
+            register = ((register << np.uint64(8)) & self.mask) ^ self.table[index]
+
+        register ^= self.xor_out
 
-        return crc_bits
+        return ((register[:, np.newaxis] >> self.bit_shifts) & np.uint64(1)).astype(np.uint8)
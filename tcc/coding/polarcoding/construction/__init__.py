@@ -6,4 +6,6 @@ Created on 10/03/2020 13:14
 @author: Rodrigo Fischer (rodrigoarfischer@gmail.com)
 """
 
-from tcc.coding.polarcoding.construction.construction import construction, bhattacharyya, tahir
+from tcc.coding.polarcoding.construction.construction import construction, bhattacharyya, tahir, \
+    polarization_weight
+from tcc.coding.polarcoding.construction.cache import ConstructionCache
@@ -0,0 +1,167 @@
+"""
+Cache for the polar code construction results.
+
+Results are kept in memory and, optionally, on a directory shared between processes and simulation runs. Each entry
+is keyed by (method, n, design SNR) and the method options, and both levels evict the least recently used entries.
+
+Created on 18/10/2026 10:00
+"""
+
+import os
+import logging
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class ConstructionCache(object):
+    def __init__(self, cache_dir=None, max_entries=128):
+        """
+        Least recently used cache of reliability indexes
+
+        :param cache_dir: directory holding the cached results, which may start with '~', None to keep the results only
+            in memory
+        :param max_entries: maximum number of entries, both in memory and on the directory
+        """
+
+        if max_entries < 1:
+            raise ValueError("The construction cache should hold at least one entry.")
+
+        self.cache_dir = os.path.expanduser(cache_dir) if cache_dir is not None else None
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+        if self.cache_dir is not None:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+
+            except OSError as error:
+                logger.warning("Could not create the construction cache directory, keeping the results only in "
+                               "memory: {}".format(error))
+                self.cache_dir = None
+
+    @staticmethod
+    def key(method, n, design_snr, options=None):
+        options = tuple(sorted(options.items())) if options else ()
+        return method, int(n), float(design_snr), options
+
+    def file_path(self, key):
+        method, n, design_snr, options = key
+        name = "_".join([method, str(n), design_snr.hex()] + ["{}-{}".format(*option) for option in options])
+        return os.path.join(self.cache_dir, name + ".npy")
+
+    def get(self, method, n, design_snr, build, options=None):
+        """
+        Get the cached reliability indexes, building and storing them on a miss
+
+        :param method: construction method
+        :param n: tree depth
+        :param design_snr: design SNR
+        :param build: function with no arguments computing the reliability indexes
+        :param options: dictionary of method options changing the result
+        :return: reliability indexes
+        """
+
+        rel_idx = self.lookup(method, n, design_snr, options)
+        if rel_idx is None:
+            rel_idx = np.asarray(build())
+            self.store(method, n, design_snr, rel_idx, options)
+
+        return rel_idx
+
+    def lookup(self, method, n, design_snr, options=None):
+        """
+        Get the cached reliability indexes, from memory or from the directory
+
+        :return: reliability indexes, None on a miss
+        """
+
+        key = self.key(method, n, design_snr, options)
+
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        rel_idx = self._load(key)
+        if rel_idx is not None:
+            self._remember(key, rel_idx)
+
+        return rel_idx
+
+    def store(self, method, n, design_snr, rel_idx, options=None):
+        """
+        Store reliability indexes built outside of the cache, in memory and on the directory
+        """
+
+        key = self.key(method, n, design_snr, options)
+        rel_idx = np.asarray(rel_idx)
+
+        self._store(key, rel_idx)
+        self._remember(key, rel_idx)
+
+    def _remember(self, key, rel_idx):
+        self.entries[key] = rel_idx
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def _load(self, key):
+        if self.cache_dir is None:
+            return None
+
+        path = self.file_path(key)
+        try:
+            rel_idx = np.load(path)
+
+        except (OSError, ValueError):
+            return None
+
+        # The access time is kept on the modification time, which is what the eviction looks at
+        try:
+            os.utime(path)
+
+        except OSError:
+            pass
+
+        return rel_idx
+
+    def _store(self, key, rel_idx):
+        if self.cache_dir is None:
+            return
+
+        # Written to a temporary file and renamed, so concurrent readers never see a partial file
+        try:
+            file_descriptor, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(file_descriptor, 'wb') as temp_file:
+                np.save(temp_file, rel_idx)
+
+            os.replace(temp_path, self.file_path(key))
+
+        except OSError as error:
+            logger.warning("Could not store the construction result on the cache: {}".format(error))
+            return
+
+        self._evict()
+
+    def _evict(self):
+        paths = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith('.npy')]
+        if len(paths) <= self.max_entries:
+            return
+
+        def modification_time(path):
+            try:
+                return os.path.getmtime(path)
+
+            except OSError:
+                return 0
+
+        paths.sort(key=modification_time)
+        for path in paths[:len(paths) - self.max_entries]:
+            try:
+                os.remove(path)
+
+            except OSError:
+                pass
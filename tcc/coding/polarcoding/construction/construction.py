@@ -10,107 +10,247 @@ import numpy as np
 from scipy.stats import norm
 import logging
 import sys
-from pynverse import inversefunc
 
 logger = logging.getLogger(__name__)
 
+# The constructions accept a scalar design SNR or an array of design SNRs; on the latter, the channel parameters
+# and the reliability indexes get one row per design SNR.
+
 
 def phi(x):
-    if 10 > x >= 0:
-        out = np.exp(-0.4527 * x ** 0.86 + 0.0218)
+    x = np.asarray(x, dtype=np.float64)
 
-    elif x >= 10:
-        out = np.sqrt(np.pi / x) * np.exp(- x / 4) * (1 - 10 / (7 * x))
+    # The clipping only keeps the unused branch of each np.where away from invalid values
+    low = np.exp(-0.4527 * np.clip(x, 0, 10) ** 0.86 + 0.0218)
+    high = np.sqrt(np.pi / np.maximum(x, 10)) * np.exp(- np.maximum(x, 10) / 4) * (1 - 10 / (7 * np.maximum(x, 10)))
 
-    else:
-        out = 0
+    return np.where(x >= 10, high, np.where(x >= 0, low, 0.0))
 
-    return out
 
+def iphi(y, iterations=64, x_max=1e4):
+    """
+    Vectorized inverse of phi, found through bisection
 
-iphi = inversefunc(phi, domain=0, open_domain=[True, False])
+    :param y: values of phi, in (0, phi(0)]
+    :param iterations: number of bisection steps; the error is bounded by x_max / 2 ** iterations
+    :param x_max: upper end of the bisection interval
+    :return: x such that phi(x) = y
+    """
+    y = np.asarray(y, dtype=np.float64)
+    low = np.zeros(y.shape)
+    high = np.full(y.shape, x_max)
 
+    for _ in range(iterations):
+        middle = (low + high) / 2
+        above = phi(middle) > y
+        low = np.where(above, middle, low)
+        high = np.where(above, high, middle)
 
-def bhattacharyya(n, design_snr):
-    start_parameter = [np.exp(- 10 ** (design_snr / 10))]
-    for i in range(n):
-        size = len(start_parameter)
-        out_parameter = np.zeros(size * 2, dtype=np.float64)
-        for j, parameter in enumerate(start_parameter):
-            out_parameter[2 * j] = 2 * parameter - parameter ** 2
-            out_parameter[2 * j + 1] = parameter ** 2
+    return (low + high) / 2
 
-        start_parameter = out_parameter
 
-    sorted_return = [x[0] for x in sorted(enumerate(start_parameter), key=lambda item: item[1])]
+def log_phi(x):
+    """
+    Natural logarithm of phi, which does not underflow for large x
+    """
+    x = np.asarray(x, dtype=np.float64)
 
-    return sorted_return, start_parameter
+    low = -0.4527 * np.clip(x, 0, 10) ** 0.86 + 0.0218
+    high = 0.5 * np.log(np.pi / np.maximum(x, 10)) - np.maximum(x, 10) / 4 + np.log(1 - 10 / (7 * np.maximum(x, 10)))
 
+    return np.where(x >= 10, high, np.where(x >= 0, low, -np.inf))
 
-def tahir(n, design_snr):
-    start_parameter = [norm.sf(np.sqrt(2 * 10 ** (design_snr / 10)))]
+
+class PhiTable(object):
+    def __init__(self, num_points=2 ** 16, x_min=1e-6, x_max=1e10):
+        """
+        Lookup table for phi and its inverse
+
+        log(phi) is sampled on a geometric grid of x and linearly interpolated, which keeps the interpolation
+        monotone between the samples. Across x = 10, where the two approximations of phi meet, phi slightly
+        increases; the inverse follows the decreasing envelope of the samples there. Outside [0, x_max] the
+        interpolation is clamped to the table ends.
+
+        :param num_points: number of table points, which sets the accuracy
+        :param x_min: smallest nonzero sample
+        :param x_max: largest sample
+        """
+
+        # Both sides of x = 10 are sampled, so the interpolation does not smooth the step of phi there
+        grid = np.geomspace(x_min, x_max, num_points - 3)
+        self.x = np.sort(np.concatenate(([0.0, np.nextafter(10, 0), 10.0], grid)))
+        self.log_phi_table = log_phi(self.x)
+        self.neg_log_phi_envelope = - np.minimum.accumulate(self.log_phi_table)
+
+    def log_phi(self, x):
+        return np.interp(x, self.x, self.log_phi_table)
+
+    def phi(self, x):
+        return np.exp(self.log_phi(x))
+
+    def inverse_log_phi(self, log_y):
+        return np.interp(- np.asarray(log_y), self.neg_log_phi_envelope, self.x)
+
+    def iphi(self, y):
+        with np.errstate(divide='ignore'):
+            return self.inverse_log_phi(np.log(y))
+
+
+# Built once, and shared by every dega call
+phi_table = PhiTable()
+
+
+def _interleave(left, right):
+    """
+    Place the left and right childs of each node side by side, on the last axis.
+    """
+    out_parameter = np.empty(left.shape[:-1] + (2 * left.shape[-1], ), dtype=np.float64)
+    out_parameter[..., 0::2] = left
+    out_parameter[..., 1::2] = right
+    return out_parameter
+
+
+def _reliability_order(parameter, descending=False):
+    # A stable sort keeps the ordering of the previous sorted(enumerate(...)) on ties
+    key = -parameter if descending else parameter
+    return np.argsort(key, axis=-1, kind='stable')
+
+
+def bhattacharyya(n, design_snr):
+    start_parameter = np.exp(- 10 ** (np.asarray(design_snr, dtype=np.float64)[..., np.newaxis] / 10))
     for i in range(n):
-        j = 2 ** i
-        out_parameter = np.zeros(j * 2, dtype=np.float64)
-        for k, parameter in enumerate(start_parameter):
-            out_parameter[2 * k] = 2 * parameter * (1 - parameter)
-            out_parameter[2 * k + 1] = norm.sf(np.sqrt(2) * norm.isf(parameter))
+        start_parameter = _interleave(2 * start_parameter - start_parameter ** 2, start_parameter ** 2)
 
-        start_parameter = out_parameter
+    return _reliability_order(start_parameter), start_parameter
 
-    sorted_return = [x[0] for x in sorted(enumerate(start_parameter), key=lambda item: item[1])]
 
-    return sorted_return, start_parameter
+def tahir(n, design_snr):
+    start_parameter = norm.sf(np.sqrt(2 * 10 ** (np.asarray(design_snr, dtype=np.float64)[..., np.newaxis] / 10)))
+    for i in range(n):
+        start_parameter = _interleave(2 * start_parameter * (1 - start_parameter),
+                                      norm.sf(np.sqrt(2) * norm.isf(start_parameter)))
+
+    return _reliability_order(start_parameter), start_parameter
 
 
 def mdega(n, design_snr):
-    start_parameter = [4 * 10 ** (design_snr / 10)]
+    start_parameter = 4 * 10 ** (np.asarray(design_snr, dtype=np.float64)[..., np.newaxis] / 10)
     for i in range(n):
-        j = 2 ** i
-        out_parameter = np.zeros(j * 2, dtype=np.float64)
-        for k, parameter in enumerate(start_parameter):
-            out_parameter[2 * k] = 2 * norm.isf(2 * norm.sf(np.sqrt(parameter / 2)) *
-                                                (1 - norm.sf(np.sqrt(parameter / 2)))) ** 2
-            out_parameter[2 * k + 1] = 2 * parameter
+        error_probability = norm.sf(np.sqrt(start_parameter / 2))
+        start_parameter = _interleave(2 * norm.isf(2 * error_probability * (1 - error_probability)) ** 2,
+                                      2 * start_parameter)
 
-        start_parameter = out_parameter
+    return _reliability_order(start_parameter, descending=True), start_parameter
 
-    sorted_return = [x[0] for x in sorted(enumerate(start_parameter), key=lambda item: item[1], reverse=True)]
 
-    return sorted_return, start_parameter
+def dega(n, design_snr, table=None):
+    """
+    Gaussian approximation construction, with phi and its inverse read from a lookup table
 
+    :param n: tree depth
+    :param design_snr: design SNR, or array of design SNRs
+    :param table: PhiTable used, the shared phi_table if None
+    :return: reliability indexes and channel parameters
+    """
 
-def dega(n, design_snr):
-    start_parameter = [4 * 10 ** (design_snr / 10)]
+    table = phi_table if table is None else table
+
+    start_parameter = 4 * 10 ** (np.asarray(design_snr, dtype=np.float64)[..., np.newaxis] / 10)
     for i in range(n):
-        j = 2 ** i
-        out_parameter = np.zeros(j * 2, dtype=np.float64)
-        for k, parameter in enumerate(start_parameter):
-            out_parameter[2 * k] = iphi(1 - (1 - phi(parameter)) ** 2)
-            out_parameter[2 * k + 1] = 2 * parameter
+        # 1 - (1 - phi) ** 2 = phi * (2 - phi), computed on the log domain so that small phi values don't underflow
+        log_phi_parameter = table.log_phi(start_parameter)
+        log_left = log_phi_parameter + np.log(2 - np.exp(log_phi_parameter))
+        start_parameter = _interleave(table.inverse_log_phi(log_left), 2 * start_parameter)
+
+    return _reliability_order(start_parameter, descending=True), start_parameter
+
 
-        start_parameter = out_parameter
+def polarization_weight(n, design_snr=None):
+    """
+    Polarization weight construction, giving a nested reliability sequence as on 5G NR
 
-    sorted_return = [x[0] for x in sorted(enumerate(start_parameter), key=lambda item: item[1], reverse=True)]
+    The weight of the bit channel i, with binary digits b_j, is the sum of b_j * 2 ** (j / 4). It doesn't depend on
+    the design SNR, and the weights of the first 2 ** m channels don't depend on n, so the sequence of any smaller
+    block is the sequence of the larger one restricted to its indexes, and any K is a truncation of the same
+    sequence.
 
-    return sorted_return, start_parameter
+    :param n: tree depth
+    :param design_snr: unused, kept for a common interface with the other constructions
+    :return: reliability indexes and polarization weights
+    """
 
+    bits = (np.arange(2 ** n)[:, np.newaxis] >> np.arange(n)) & 1
+    weights = bits @ 2 ** (np.arange(n) / 4)
+
+    return _reliability_order(weights, descending=True), weights
+
+
+def construction(method, n, design_snr, cache=None, **options):
+    """
+    Compute the reliability indexes of the polar code, in descending order
+
+    :param method: construction method
+    :param n: tree depth
+    :param design_snr: design SNR, or array of design SNRs
+    :param cache: optional ConstructionCache holding previous results, keyed per design SNR
+    :param options: method specific options, only used by the 'monte-carlo' method
+    :return: reliability indexes
+    """
 
-def construction(method, n, design_snr):
     if method == "bhattacharyya":
-        rel_idx = bhattacharyya(n, design_snr)[0]
+        build = bhattacharyya
 
     elif method == "tahir":
-        rel_idx = tahir(n, design_snr)[0]
+        build = tahir
 
     elif method == "mdega":
-        rel_idx = mdega(n, design_snr)[0]
+        build = mdega
 
     elif method == "dega":
-        rel_idx = dega(n, design_snr)[0]
+        build = dega
+
+    elif method == "pw":
+        build = polarization_weight
+
+    elif method == "monte-carlo":
+        from tcc.coding.polarcoding.construction.monte_carlo import monte_carlo
+
+        def build(n, design_snr):
+            return monte_carlo(n, design_snr, **options)
 
     else:
         logger.error("Construction method not implemented {}".format(method))
         sys.exit(1)
 
-    return rel_idx
+    if cache is None:
+        return build(n, design_snr)[0]
+
+    if method == "pw":
+        # The sequence doesn't depend on the design SNR, so it is cached once per n, under a fixed SNR
+        rel_idx = cache.get(method, n, 0.0, lambda: build(n)[0], options)
+        if np.ndim(design_snr) == 0:
+            return rel_idx
+
+        return np.tile(rel_idx, np.shape(design_snr) + (1, ))
+
+    if np.ndim(design_snr) == 0:
+        return cache.get(method, n, design_snr, lambda: build(n, design_snr)[0], options)
+
+    # Each design SNR of an array is cached on its own, and the missing ones are built together
+    design_snr = np.asarray(design_snr, dtype=np.float64)
+    rel_idx = [cache.lookup(method, n, snr, options) for snr in design_snr.flat]
+    missing = [i for i, entry in enumerate(rel_idx) if entry is None]
+
+    if missing:
+        missing_snr = design_snr.flatten()[missing]
+        if method in ["bhattacharyya", "tahir", "mdega", "dega"]:
+            built = build(n, missing_snr)[0]
+
+        else:
+            built = [build(n, snr)[0] for snr in missing_snr]
+
+        for i, snr, entry in zip(missing, missing_snr, built):
+            cache.store(method, n, snr, entry, options)
+            rel_idx[i] = entry
+
+    return np.stack(rel_idx).reshape(design_snr.shape + (-1, ))
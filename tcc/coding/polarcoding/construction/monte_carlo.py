@@ -0,0 +1,120 @@
+"""
+Monte-Carlo polar code construction.
+
+The error probability of each bit channel is estimated by genie-aided SC decoding of random frames at the design SNR,
+through the actual modulator, channel and demodulator. Unlike the analytic constructions, it holds for any
+modulation order and demodulator.
+
+Created on 18/10/2026 14:05
+"""
+
+import multiprocessing as mp
+
+import numpy as np
+
+from tcc.core.utils.mod_demod import Modulator, Demodulator
+from tcc.core.utils.constellation import PolarConstellation
+from tcc.core.utils.awgn import AWGN
+from tcc.coding.polarcoding.polarcoding import PolarCoding
+from tcc.coding.polarcoding.construction.construction import bhattacharyya
+
+
+def monte_carlo(n, design_snr, bits_p_symbol=1, demod_type='max-log', num_frames=10000, batch_size=256,
+                num_workers=1, seed=0, implementation_type='python'):
+    """
+    Estimate the bit channel error probabilities by genie-aided SC decoding
+
+    The frames are split among num_workers processes, each one with its own generator spawned from seed. Daemonic
+    processes, such as the simulation workers, can't start child processes and run every share themselves.
+
+    :param n: tree depth
+    :param design_snr: design SNR, as Es/N0 in dB
+    :param bits_p_symbol: modulation order
+    :param demod_type: demodulator type, 'max-log' or 'llr_exact'
+    :param num_frames: number of simulated frames
+    :param batch_size: number of frames decoded at once
+    :param num_workers: number of processes
+    :param seed: entropy of the seed sequence
+    :param implementation_type: 'python' or 'pythran' decoding kernel
+    :return: reliability indexes and estimated bit channel error probabilities
+    """
+
+    seed_sequences = np.random.SeedSequence(seed).spawn(num_workers)
+    shares = [num_frames // num_workers + (1 if i < num_frames % num_workers else 0) for i in range(num_workers)]
+    jobs = [(n, design_snr, bits_p_symbol, demod_type, share, batch_size, seed_sequence, implementation_type)
+            for share, seed_sequence in zip(shares, seed_sequences)]
+
+    if num_workers > 1 and not mp.current_process().daemon:
+        with mp.Pool(num_workers) as pool:
+            results = pool.starmap(_genie_errors, jobs)
+
+    else:
+        results = [_genie_errors(*job) for job in jobs]
+
+    errors = np.sum([result[0] for result in results], axis=0)
+    simulated_frames = sum(result[1] for result in results)
+    error_rate = errors / simulated_frames
+
+    # The most reliable channels often show no errors, and the ties are broken by the Bhattacharyya parameters
+    tie_break = bhattacharyya(n, design_snr)[1]
+    rel_idx = np.lexsort((tie_break, error_rate))
+
+    return rel_idx, error_rate
+
+
+def _genie_errors(n, design_snr, bits_p_symbol, demod_type, num_frames, batch_size, seed_sequence,
+                  implementation_type):
+    """
+    Count the genie-aided decision errors of each bit channel over num_frames frames.
+
+    :return: error counts and number of simulated frames
+    """
+
+    from tcc.coding.polarcoding.decoder_setup import address_list
+    from tcc.coding.polarcoding.polarfuncs.polarfuncs import ssc_scheduler, task_compiler
+    from tcc.coding.polarcoding.polarfuncs.bit_packing import pack_bits, unpack_bits
+
+    if implementation_type == 'python':
+        from tcc.coding.polarcoding.polarfuncs.polarfuncs import encode_packed, genie_sc_decode_batch
+
+    elif implementation_type == 'pythran':
+        from tcc.coding.polarcoding.polarfuncs.polarfuncs_compiled import encode_packed, genie_sc_decode_batch
+
+    else:
+        raise ValueError("Invalid implementation type: {}".format(implementation_type))
+
+    rng = np.random.default_rng(seed_sequence)
+    block_size = 2 ** n
+
+    # Every leaf is decoded on its own, as on the plain SC decoder
+    node_sheet = np.full(2 ** (n + 1) - 1, 2, dtype=np.uint8)
+    node_sheet[2 ** n - 1:] = 1
+
+    workspace = PolarCoding.Workspace(n, (n + 1) * 2 ** n)
+    program = task_compiler(ssc_scheduler(np.uint8(n), node_sheet), address_list(n, 'full', implementation_type),
+                            node_sheet, np.uint32(workspace.zero_address))
+
+    modulator = Modulator(PolarConstellation(), bits_p_symbol)
+    demodulator = Demodulator(PolarConstellation(), demod_type, bits_p_symbol)
+    awgn = AWGN(bits_p_symbol, rng, snr_unit='EsN0_dB')
+
+    # Each batch must fill whole symbols
+    symbol_frames = bits_p_symbol // np.gcd(bits_p_symbol, block_size)
+
+    errors = np.zeros(block_size, dtype=np.int64)
+    simulated_frames = 0
+    while simulated_frames < num_frames:
+        frames = min(batch_size, num_frames - simulated_frames)
+        frames += -frames % symbol_frames
+
+        bits = rng.integers(0, 2, (frames, block_size), dtype=np.uint8)
+        code_words = unpack_bits(encode_packed(pack_bits(bits), np.uint8(n)), block_size)
+
+        noisy_symbols = awgn(modulator(code_words.flatten()), snr=design_snr)
+        llr = demodulator(noisy_symbols, awgn.variance).reshape((frames, block_size))
+
+        alpha_array, beta_array = workspace.batch(frames)
+        errors += genie_sc_decode_batch(np.uint8(n), llr, bits, program, alpha_array, beta_array)
+        simulated_frames += frames
+
+    return errors, simulated_frames
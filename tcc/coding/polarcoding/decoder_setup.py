@@ -0,0 +1,138 @@
+"""
+Process-wide memoization of the decoder setup.
+
+The address list only depends on n and on the memory layout, and the node sheet, the schedule and the compiled
+program only depend on the frozen set and on the decoding algorithm. Since simulation workers build a new decoder on
+every design SNR change, these are shared by every PolarCoding of the process, on least recently used caches with a
+bounded number of entries.
+
+Created on 18/10/2026 16:30
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from .special_nodes import special_opcodes
+
+ADDRESS_LIST_CACHE_SIZE = 8
+SCHEDULE_CACHE_SIZE = 64
+
+
+def _polarfuncs(implementation_type):
+    if implementation_type == 'python':
+        from .polarfuncs import polarfuncs
+
+        return polarfuncs
+
+    elif implementation_type == 'pythran':
+        try:
+            from .polarfuncs import polarfuncs_compiled
+
+            return polarfuncs_compiled
+
+        except ImportError:
+            raise ImportError("Was not able to load the compiled encoder.")
+
+    else:
+        raise ValueError("Invalid implementation type: {}".format(implementation_type))
+
+
+def workspace_size(n, memory_layout):
+    """
+    Number of alphas and betas addressed by the memory layout.
+    """
+
+    if memory_layout == 'full':
+        return (n + 1) * 2 ** n
+
+    elif memory_layout == 'compact':
+        return 3 * 2 ** n - 2
+
+    else:
+        raise ValueError("Invalid memory layout: {}".format(memory_layout))
+
+
+def frozen_key(n, frozen):
+    """
+    Hashable key of a frozen set, which doesn't depend on the order of the indexes.
+    """
+
+    frozen_mask = np.zeros(2 ** n, dtype=np.uint8)
+    frozen_mask[frozen] = 1
+    return np.packbits(frozen_mask).tobytes()
+
+
+@lru_cache(maxsize=ADDRESS_LIST_CACHE_SIZE)
+def address_list(n, memory_layout, implementation_type):
+    """
+    Get the address list of the memory layout.
+
+    :param n: tree depth
+    :param memory_layout: 'full' or 'compact'
+    :param implementation_type: 'python' or 'pythran'
+    :return: 2d ndarray, shared between decoders and not to be modified
+    """
+
+    funcs = _polarfuncs(implementation_type)
+
+    if memory_layout == 'full':
+        return funcs.address_list_factory(np.uint8(n)).astype(np.uint32)
+
+    elif memory_layout == 'compact':
+        return funcs.compact_address_list_factory(np.uint8(n)).astype(np.uint32)
+
+    else:
+        raise ValueError("Invalid memory layout: {}".format(memory_layout))
+
+
+@lru_cache(maxsize=SCHEDULE_CACHE_SIZE)
+def schedule(n, key, decoding_algorithm, memory_layout, implementation_type, special_nodes=()):
+    """
+    Get the node sheet, the tasks and the compiled program of a frozen set.
+
+    :param n: tree depth
+    :param key: frozen set key, from frozen_key
+    :param decoding_algorithm: decoding algorithm, as on PolarCoding
+    :param memory_layout: 'full' or 'compact'
+    :param implementation_type: 'python' or 'pythran'
+    :param special_nodes: tuple with the names of the special nodes, or 'all'
+    :return: node sheet, tasks and program, shared between decoders and not to be modified
+    """
+
+    # The schedulers are not compiled
+    from .polarfuncs.polarfuncs import ssc_scheduler, fast_ssc_scheduler, sscl_spc_scheduler, task_compiler
+
+    funcs = _polarfuncs(implementation_type)
+
+    if decoding_algorithm in ['ssc', 'scan']:
+        if special_nodes:
+            raise ValueError("Special nodes are not available on the SSC and SCAN decoders.")
+
+        node_classifier = funcs.ssc_node_classifier
+        scheduler = ssc_scheduler
+        opcodes = None
+
+    elif decoding_algorithm in ['fast-ssc', 'sc-flip', 'dsc-flip']:
+        node_classifier = funcs.extended_node_classifier if special_nodes else funcs.fast_ssc_node_classifier
+        scheduler = fast_ssc_scheduler
+        opcodes = special_opcodes(special_nodes)
+
+    elif decoding_algorithm in ['sscl-spc', 'sscl-spc-crc', 'fast-sscl', 'fast-sscl-crc']:
+        node_classifier = funcs.extended_node_classifier if special_nodes else funcs.fast_ssc_node_classifier
+        scheduler = sscl_spc_scheduler
+        opcodes = special_opcodes(special_nodes, list_decoding=True)
+
+    else:
+        raise ValueError('Invalid decoding type: {}'.format(decoding_algorithm))
+
+    frozen_mask = np.unpackbits(np.frombuffer(key, dtype=np.uint8))[:2 ** n]
+    information = np.flatnonzero(frozen_mask == 0).astype(np.uint32)
+    frozen = np.flatnonzero(frozen_mask).astype(np.uint32)
+
+    node_sheet = node_classifier(np.uint8(n), information, frozen)
+    tasks = scheduler(np.uint8(n), node_sheet) if opcodes is None else scheduler(np.uint8(n), node_sheet, opcodes)
+    program = task_compiler(tasks, address_list(n, memory_layout, implementation_type), node_sheet,
+                            np.uint32(workspace_size(n, memory_layout)))
+
+    return node_sheet, tasks, program
@@ -6,6 +6,8 @@ Created on 12/02/2020 11:25
 @author: Rodrigo Fischer (rodrigoarfischer@gmail.com)
 """
 
+import heapq
+
 import numpy as np
 
 
@@ -15,27 +17,54 @@ class PolarCoding(object):
     """
 
     def __init__(self, n, k, rel_idx=None, decoding_algorithm='ssc', list_size=None, encoding_mode='systematic',
-                 implementation_type='pythran', crc=None):
+                 implementation_type='pythran', crc=None, memory_layout='full', llr_format='float64',
+                 special_nodes=None, flip_attempts=8, flip_order=2, max_iterations=None, early_stopping=None,
+                 hard_decision_check=False):
         """
 
         :param n: Block size N = 2^n
         :param rel_idx: Reliability indexes in descending order
+        :param memory_layout: decoder workspace layout, 'full' or 'compact'
+        :param llr_format: decoder LLR format, 'float64' or the fixed-point 'int8' and 'int16'; fixed-point decoders
+            expect LLRs already quantized to that format
+        :param special_nodes: special nodes decoded without traversing their subtree by the Fast-SSC decoder, as a
+            list of names from special_nodes.SPECIAL_NODES or 'all'. The list decoders only take the G-REP and G-PC
+            nodes, Type-I to Type-III included, and not 'all'
+        :param flip_attempts: maximum number of extra decoding attempts of the sc-flip and dsc-flip decoders
+        :param flip_order: maximum number of decisions flipped at once by the dsc-flip decoder
+        :param max_iterations: maximum number of iterations of the bp and scan decoders, None for their default
+        :param early_stopping: stopping criterion of the bp and scan decoders before max_iterations: None, 'g-matrix'
+            (the hard decisions are a codeword) or 'crc' (the CRC passes)
+        :param hard_decision_check: whether to output the channel hard decisions without decoding when they are already
+            a codeword, and the CRC passes on decoders using one
         """
 
         self.N = 2 ** n
         self.n = n
-        self.K = k
-        self.rate = self.K / self.N
 
         self.F = np.array([[1, 0], [1, 1]], dtype=np.uint8)
 
-        self.Fn = self._generate_g()
+        # The N x N generator matrix is not used for encoding, and is only built when requested
+        self._Fn = None
 
         self.dec_type = decoding_algorithm
         self.list_size = list_size
         self.enc_mode = encoding_mode
         self.imp_type = implementation_type
         self.crc = crc
+        self.mem_layout = memory_layout
+        self.llr_format = llr_format
+        self.special_nodes = special_nodes if special_nodes == 'all' else tuple(special_nodes or ())
+        self.flip_attempts = flip_attempts
+        self.flip_order = flip_order
+        self.max_iterations = max_iterations
+        self.early_stopping = early_stopping
+        self.hard_decision_check = hard_decision_check
+
+        if not 0 < k <= self.N:
+            raise ValueError("Invalid message size: K should be between 1 and 2^n")
+
+        self._K = k
 
         if rel_idx is not None:
             if not np.array_equal(np.sort(rel_idx), np.arange(0, self.N)):
@@ -46,11 +75,16 @@ class PolarCoding(object):
 
         self._rel_idx = np.array(rel_idx, dtype=np.uint32)
 
-        self.information = self._rel_idx[:self.K]
-        self.frozen = self._rel_idx[self.K:]
+        self.encode = None
+        self.decode = None
+        self._update_code()
+
+    @property
+    def Fn(self):
+        if self._Fn is None:
+            self._Fn = self._generate_g()
 
-        self.encode = PolarCoding.Encode(self)
-        self.decode = PolarCoding.Decode(self)
+        return self._Fn
 
     @property
     def rel_idx(self):
@@ -68,11 +102,41 @@ class PolarCoding(object):
 
         self._rel_idx = np.array(idx, dtype=np.uint32)
 
+        self._update_code()
+
+    @property
+    def K(self):
+        return self._K
+
+    @K.setter
+    def K(self, k):
+        """
+        Change the message size. With a nested reliability sequence, rel_idx is the same for every K.
+        """
+
+        if not 0 < k <= self.N:
+            raise ValueError("Invalid message size: K should be between 1 and 2^n")
+
+        self._K = k
+
+        self._update_code()
+
+    @property
+    def rate(self):
+        return self.K / self.N
+
+    def _update_code(self):
         self.information = self._rel_idx[:self.K]
         self.frozen = self._rel_idx[self.K:]
 
-        self.encode = PolarCoding.Encode(self)
-        self.decode = PolarCoding.Decode(self)
+        # Changing K or rel_idx keeps the kernels and workspaces, which only depend on n, the layout and the list size
+        if self.decode is None:
+            self.encode = PolarCoding.Encode(self)
+            self.decode = PolarCoding.Decode(self)
+
+        else:
+            self.encode.set_code(self)
+            self.decode.set_code(self)
 
     def _generate_g(self):
         """
@@ -90,8 +154,6 @@ class PolarCoding(object):
         def __init__(self, obj):
             self.N = obj.N
             self.n = obj.n
-            self.information = obj.information
-            self.frozen = obj.frozen
 
             if obj.enc_mode == "systematic":
                 self.enc = self.systematic
@@ -102,16 +164,21 @@ class PolarCoding(object):
             else:
                 raise ValueError("The encoding mode should be 'systematic' or 'non-systematic'")
 
+            from .polarfuncs.bit_packing import pack_bits, unpack_bits
+
+            self.pack_bits = pack_bits
+            self.unpack_bits = unpack_bits
+
             if obj.imp_type == 'python':
-                from .polarfuncs.polarfuncs import encode
+                from .polarfuncs.polarfuncs import encode_packed
 
-                self.encode = encode
+                self.encode_packed = encode_packed
 
             elif obj.imp_type == 'pythran':
                 try:
-                    from .polarfuncs.polarfuncs_compiled import encode
+                    from .polarfuncs.polarfuncs_compiled import encode_packed
 
-                    self.encode = encode
+                    self.encode_packed = encode_packed
 
                 except ImportError:
                     raise ImportError("Was not able to load the compiled encoder.")
@@ -121,86 +188,114 @@ class PolarCoding(object):
 
             self.crc = obj.crc
 
+            self.set_code(obj)
+
+        def set_code(self, obj):
+            """
+            Take the information and frozen sets of the code
+            """
+
+            self.information = obj.information
+            self.frozen = obj.frozen
+
+            self.information_mask = self.pack_bits(np.ones((1, self.information.size), dtype=np.uint8), self.N,
+                                                   self.information)
+
         def __call__(self, bits):
             """
             Perform polar encoding
-            :param bits: integer unidimensional ndarray of 0's and 1's
-            :return: b * Fn
+            :param bits: integer ndarray of 0's and 1's, either a single frame (K, ) or a batch of frames (frames, K)
+            :return: b * Fn, shaped (N, ) or (frames, N)
             """
 
             if self.crc is not None:
                 crc = self.crc(bits)
-                bits = np.concatenate((bits, crc))
+                bits = np.concatenate((bits, crc), axis=-1)
 
             return self.enc(bits)
 
+        def _pack(self, bits):
+            return self.pack_bits(bits.reshape((-1, bits.shape[-1])), self.N, self.information)
+
+        def _unpack(self, words, bits):
+            return self.unpack_bits(words, self.N).reshape(bits.shape[:-1] + (self.N, ))
+
         def non_systematic(self, bits):
             """
             Perform non-systematic polar encoding
 
-            :param bits: integer unidimensional ndarray of 0's and 1's
+            :param bits: integer ndarray of 0's and 1's, shaped (K, ) or (frames, K)
             :return: b * Fn
             """
 
-            # TODO: pass these operations to inside 'encode'
-            bit_vector = np.zeros(self.N, dtype=np.uint8)
-            bit_vector[self.information] = bits
-            return self.encode(bit_vector, self.n)
+            return self._unpack(self.encode_packed(self._pack(bits), np.uint8(self.n)), bits)
 
         def systematic(self, bits):
             """
             Perform systematic polar encoding
 
-            :param bits: integer unidimensional ndarray of 0's and 1's
+            :param bits: integer ndarray of 0's and 1's, shaped (K, ) or (frames, K)
             :return: b * Fn
             """
 
-            # TODO: pass these operations to inside 'encode'
-            bit_vector = np.zeros(self.N, dtype=np.uint8)
-            bit_vector[self.information] = bits
-            first_encoded = self.encode(bit_vector, self.n)
+            first_encoded = self.encode_packed(self._pack(bits), np.uint8(self.n))
 
-            first_encoded[self.frozen] = 0
+            # Clears the frozen positions without leaving the packed words
+            first_encoded &= self.information_mask
 
-            return self.encode(first_encoded, self.n)
+            return self._unpack(self.encode_packed(first_encoded, np.uint8(self.n)), bits)
 
     class Decode(object):
         def __init__(self, obj):
 
-            from .polarfuncs.polarfuncs import fast_ssc_scheduler, sscl_spc_scheduler, ssc_scheduler
+            from .decoder_setup import address_list, workspace_size
 
             if obj.imp_type == 'python':
                 from .polarfuncs.polarfuncs import (
-                    address_list_factory,
-                    ssc_node_classifier,
-                    fast_ssc_node_classifier,
                     encode,
+                    encode_batch,
                     ssc_decode,
                     fast_ssc_decode,
-                    sscl_spc_decode
+                    fast_ssc_flip_decode,
+                    fast_ssc_decode_batch,
+                    sscl_spc_decode,
+                    scan_decode_batch,
+                    bp_decode_batch
                 )
 
                 self.encode = encode
+                self.encode_batch = encode_batch
                 self.ssc_decode = ssc_decode
                 self.fast_ssc_decode = fast_ssc_decode
+                self.fast_ssc_flip_decode = fast_ssc_flip_decode
+                self.fast_ssc_decode_batch = fast_ssc_decode_batch
                 self.sscl_spc_decode = sscl_spc_decode
+                self.scan_decode_batch = scan_decode_batch
+                self.bp_decode_batch = bp_decode_batch
 
             elif obj.imp_type == 'pythran':
                 try:
                     from .polarfuncs.polarfuncs_compiled import (
-                        address_list_factory,
-                        ssc_node_classifier,
-                        fast_ssc_node_classifier,
                         encode,
+                        encode_batch,
                         ssc_decode,
                         fast_ssc_decode,
-                        sscl_spc_decode
+                        fast_ssc_flip_decode,
+                        fast_ssc_decode_batch,
+                        sscl_spc_decode,
+                        scan_decode_batch,
+                        bp_decode_batch
                     )
 
                     self.encode = encode
+                    self.encode_batch = encode_batch
                     self.ssc_decode = ssc_decode
                     self.fast_ssc_decode = fast_ssc_decode
+                    self.fast_ssc_flip_decode = fast_ssc_flip_decode
+                    self.fast_ssc_decode_batch = fast_ssc_decode_batch
                     self.sscl_spc_decode = sscl_spc_decode
+                    self.scan_decode_batch = scan_decode_batch
+                    self.bp_decode_batch = bp_decode_batch
 
                 except ImportError:
                     raise ImportError("Was not able to load the compiled encoder.")
@@ -209,13 +304,38 @@ class PolarCoding(object):
                 raise ValueError("Invalid implementation type: {}".format(obj.imp_type))
 
             self.n = np.uint8(obj.n)
-            self.address_list = address_list_factory(self.n).astype(np.uint32)
-            self.information = obj.information
+
+            # The address list only depends on n and is shared by every decoder of the process
+            self.address_list = address_list(obj.n, obj.mem_layout, obj.imp_type)
+            memory_size = workspace_size(obj.n, obj.mem_layout)
+
+            if obj.llr_format == 'float64':
+                self.llr_dtype = np.dtype(np.float64)
+                self.llr_max = np.inf
+
+            elif obj.llr_format in ['int8', 'int16']:
+                # Saturating symmetrically keeps the left node operation from overflowing on abs(-2 ** (bits - 1))
+                self.llr_dtype = np.dtype(obj.llr_format)
+                self.llr_max = float(np.iinfo(self.llr_dtype).max)
+
+            else:
+                raise ValueError("Invalid LLR format: {}".format(obj.llr_format))
+
             self.enc_mode = obj.enc_mode
 
+            # Decoders using the CRC set it, and remove the CRC bits from their output
+            self.crc = None
+
+            # Frames that skipped the decoder on the hard-decision check, over the checked frames
+            self.hard_decision_check = obj.hard_decision_check
+            self.checked_frames = 0
+            self.hard_decision_frames = 0
+
+            # Decoders without a dedicated batch implementation decode the frames one by one
+            self.batch_decoder = self.frame_loop_dec
+
             if obj.dec_type == 'ssc':
-                self.node_sheet = ssc_node_classifier(self.n, obj.information, obj.frozen)
-                self.tasks = ssc_scheduler(self.n, self.node_sheet)
+                self.workspace = PolarCoding.Workspace(obj.n, memory_size, llr_dtype=self.llr_dtype)
 
                 if self.enc_mode == 'systematic':
                     self.decoder = self.ssc_dec_sys
@@ -224,27 +344,60 @@ class PolarCoding(object):
                     self.decoder = self.ssc_dec
 
             elif obj.dec_type == 'fast-ssc':
-                self.node_sheet = fast_ssc_node_classifier(self.n, obj.information, obj.frozen)
-                self.tasks = fast_ssc_scheduler(self.n, self.node_sheet)
+                self.workspace = PolarCoding.Workspace(obj.n, memory_size, llr_dtype=self.llr_dtype)
 
                 if self.enc_mode == 'systematic':
                     self.decoder = self.fast_ssc_dec_sys
+                    self.batch_decoder = self.fast_ssc_batch_dec_sys
 
                 else:
                     self.decoder = self.fast_ssc_dec
+                    self.batch_decoder = self.fast_ssc_batch_dec
+
+            elif obj.dec_type in ['sc-flip', 'dsc-flip']:
+                if obj.crc is None:
+                    raise ValueError("Please provide a CRC on sc-flip/dsc-flip modes.")
 
-            elif obj.dec_type in ['sscl-spc', 'sscl-spc-crc']:
-                self.node_sheet = fast_ssc_node_classifier(self.n, obj.information, obj.frozen)
+                if obj.flip_attempts < 0:
+                    raise ValueError("The number of flip attempts can't be negative.")
+
+                self.crc = obj.crc
+                self.flip_attempts = obj.flip_attempts
+
+                # SC-Flip only flips one decision, ordered by its reliability, while DSC-Flip ranks flip sets with
+                # the metric of Chandesris et al.
+                self.flip_order = 1 if obj.dec_type == 'sc-flip' else obj.flip_order
+                self.flip_metric = self.sc_flip_metric if obj.dec_type == 'sc-flip' else self.dsc_flip_metric
+
+                self.workspace = PolarCoding.Workspace(obj.n, memory_size, llr_dtype=self.llr_dtype)
+                self.flips = np.zeros(2 ** obj.n, dtype=np.uint8)
+                self.reliabilities = np.zeros(2 ** obj.n, dtype=np.float64)
+
+                # Extra attempts over the frames decoded so far
+                self.flip_frames = 0
+                self.flip_extra_attempts = 0
+
+                self.decoder = self.flip_dec
+
+            elif obj.dec_type in ['sscl-spc', 'sscl-spc-crc', 'fast-sscl', 'fast-sscl-crc']:
 
                 if obj.list_size is None:
-                    raise ValueError("Please provide a list size for sscl-spc/spc-crc modes.")
+                    raise ValueError("Please provide a list size for sscl-spc/fast-sscl modes.")
 
-                if obj.dec_type == 'sscl-spc-crc' and obj.crc is None:
-                    raise ValueError("Please provide a CRC on sscl-spc-crc mode.")
+                if obj.dec_type in ['sscl-spc-crc', 'fast-sscl-crc'] and obj.crc is None:
+                    raise ValueError("Please provide a CRC on sscl-spc-crc/fast-sscl-crc modes.")
 
                 self.crc = obj.crc
                 self.list_size = np.uint8(obj.list_size)
-                self.tasks = sscl_spc_scheduler(self.n, self.node_sheet)
+
+                # Fast-SSCL forks at most on the L - 1 least reliable bits of rate-1 and SPC nodes
+                if obj.dec_type in ['fast-sscl', 'fast-sscl-crc']:
+                    self.fork_limit = obj.list_size - 1
+
+                else:
+                    self.fork_limit = 2 ** obj.n
+
+                self.workspace = PolarCoding.Workspace(obj.n, memory_size, obj.list_size, self.llr_dtype)
 
                 if self.enc_mode == 'systematic':
                     self.decoder = self.sscl_spc_dec_sys
@@ -252,25 +405,161 @@ class PolarCoding(object):
                 else:
                     self.decoder = self.sscl_spc_dec
 
+            elif obj.dec_type in ['bp', 'scan']:
+                if obj.mem_layout != 'full':
+                    raise ValueError("The bp and scan decoders keep their messages between iterations, and need the "
+                                     "full memory layout.")
+
+                if obj.llr_format != 'float64':
+                    raise ValueError("The bp and scan decoders only take float64 LLRs.")
+
+                if obj.early_stopping not in [None, 'g-matrix', 'crc']:
+                    raise ValueError("Invalid early stopping criterion: {}".format(obj.early_stopping))
+
+                if obj.early_stopping == 'crc' and obj.crc is None:
+                    raise ValueError("Please provide a CRC on the crc early stopping criterion.")
+
+                if obj.max_iterations is None:
+                    self.max_iterations = PolarCoding.Decode.DEFAULT_ITERATIONS[obj.dec_type]
+
+                elif obj.max_iterations < 1:
+                    raise ValueError("The bp and scan decoders need at least one iteration.")
+
+                else:
+                    self.max_iterations = obj.max_iterations
+
+                self.crc = obj.crc
+                self.early_stopping = obj.early_stopping
+                self.iteration = self.bp_iteration if obj.dec_type == 'bp' else self.scan_iteration
+
+                self.workspace = PolarCoding.Workspace(obj.n, memory_size)
+
+                # Iterations over the frames decoded so far
+                self.iterative_frames = 0
+                self.iterations = 0
+
+                self.decoder = self.iterative_dec
+                self.batch_decoder = self.iterative_batch_dec
+
             else:
                 raise ValueError('Invalid decoding type: {}'.format(obj.dec_type))
 
+            self.set_code(obj)
+
+        def set_code(self, obj):
+            """
+            Take the information and frozen sets of the code, and look up its schedule
+            """
+
+            from .decoder_setup import schedule, frozen_key
+
+            self.information = obj.information
+            self.frozen = obj.frozen
+
+            # The schedule only depends on the frozen set, not on the order of the information bits, and is shared by
+            # every decoder of the process. The bp decoder works on the factor graph and has no schedule.
+            if obj.dec_type == 'bp':
+                self.node_sheet, self.tasks, self.program = None, None, None
+
+            else:
+                self.node_sheet, self.tasks, self.program = schedule(obj.n, frozen_key(obj.n, obj.frozen),
+                                                                     obj.dec_type, obj.mem_layout, obj.imp_type,
+                                                                     obj.special_nodes)
+
         def __call__(self, llr):
-            return self.decoder(llr)
+            """
+            Perform polar decoding
+            :param llr: channel LLRs, either a single frame (N, ) or a batch of frames (frames, N)
+            :return: decoded information bits, shaped (K, ) or (frames, K)
+            """
+
+            if llr.dtype != self.llr_dtype:
+                if self.llr_dtype != np.float64:
+                    raise ValueError("Expected LLRs quantized to {}, got {}".format(self.llr_dtype, llr.dtype))
+
+                llr = llr.astype(np.float64)
+
+            if not self.hard_decision_check:
+                if llr.ndim == 1:
+                    return self.decoder(llr)
+
+                else:
+                    return self.batch_decoder(llr)
+
+            if llr.ndim == 1:
+                passed, bits = self.hard_decision_dec(llr[np.newaxis, :])
+                return bits[0] if passed[0] else self.decoder(llr)
+
+            passed, output = self.hard_decision_dec(llr)
+            if not np.all(passed):
+                output[~passed] = self.batch_decoder(llr[~passed])
+
+            return output
+
+        @property
+        def hard_decision_rate(self):
+            """
+            Fraction of the checked frames that skipped the decoder on the hard-decision check
+            """
+
+            return self.hard_decision_frames / self.checked_frames if self.checked_frames else 0.0
+
+        def hard_decision_dec(self, llr):
+            """
+            Check whether the channel hard decisions are already a codeword of the frozen set: re-encoding gives the
+            bits before the polar transform, whose frozen bits must be zero. The CRC is also checked on decoders using
+            one.
+
+            :param llr: channel LLRs, one frame per row
+            :return: mask of the frames that passed the check, and their information bits
+            """
+
+            codewords = (llr <= 0).astype(np.uint8)
+            messages = self.encode_batch(codewords, self.n)
+
+            passed = np.all(messages[:, self.frozen] == 0, axis=1)
+            bits = (codewords if self.enc_mode == 'systematic' else messages)[:, self.information]
+
+            if self.crc is not None:
+                # The CRC is only computed for the frames that are codewords
+                codeword_frames = np.flatnonzero(passed)
+                passed[codeword_frames] = np.all(bits[codeword_frames, -self.crc.len_bit:] ==
+                                                 self.crc(bits[codeword_frames, :-self.crc.len_bit]), axis=1)
+                bits = bits[:, :-self.crc.len_bit]
+
+            self.checked_frames += llr.shape[0]
+            self.hard_decision_frames += np.count_nonzero(passed)
+
+            return passed, bits
+
+        def frame_loop_dec(self, llr):
+            return np.array([self.decoder(frame_llr) for frame_llr in llr])
 
         def ssc_dec_sys(self, llr):
-            dec_bits = self.ssc_decode(self.n, llr, self.tasks, self.address_list)
+            dec_bits = self.ssc_decode(self.n, llr, self.program, self.workspace.alpha_array,
+                                       self.workspace.beta_array, self.llr_max)
             return dec_bits[self.information]
 
         def fast_ssc_dec_sys(self, llr):
-            dec_bits = self.fast_ssc_decode(self.n, llr, self.tasks, self.address_list)
+            dec_bits = self.fast_ssc_decode(self.n, llr, self.program, self.workspace.alpha_array,
+                                            self.workspace.beta_array, self.llr_max)
             return dec_bits[self.information]
 
+        def fast_ssc_batch_dec_sys(self, llr):
+            alpha_array, beta_array = self.workspace.batch(llr.shape[0])
+            dec_bits = self.fast_ssc_decode_batch(self.n, llr, self.program, alpha_array, beta_array, self.llr_max)
+            return dec_bits[:, self.information]
+
         def sscl_spc_dec_sys(self, llr):
-            betas, metrics, n_paths = self.sscl_spc_decode(self.n, self.list_size, llr, self.tasks, self.address_list)
+            betas, metrics, n_paths = self.sscl_spc_decode(self.n, self.list_size, llr, self.program,
+                                                           self.workspace.alpha_array, self.workspace.beta_array,
+                                                           self.workspace.alpha_pointer_array,
+                                                           self.workspace.beta_pointer_array,
+                                                           self.workspace.metrics, self.fork_limit, self.llr_max)
 
             if self.crc is None:
-                dec_bits = betas[0, :2 ** self.n]
+                final_path = np.argmin(metrics[:n_paths, 0])
+                dec_bits = betas[final_path, :2 ** self.n]
                 output = dec_bits[self.information]
 
             else:
@@ -286,34 +575,207 @@ class PolarCoding(object):
                     if np.all(rec_crc == obt_crc):
                         valid_paths.append(path)
 
-                # TODO: replace argsort with argmax
                 if valid_paths:
-                    order = np.argsort(metrics[valid_paths, 0])
-                    final_path = valid_paths[order[0]]
+                    final_path = valid_paths[np.argmin(metrics[valid_paths, 0])]
 
                 else:
-                    order = np.argsort(metrics[:n_paths, 0])
-                    final_path = order[0]
+                    final_path = np.argmin(metrics[:n_paths, 0])
 
                 output = code_word[final_path][:-self.crc.len_bit]
 
             return output
 
+        # Scale of the dsc-flip metric penalty, as proposed by Chandesris et al.
+        DSC_FLIP_ALPHA = 0.3
+
+        @property
+        def average_extra_attempts(self):
+            """
+            Average number of extra decoding attempts per frame of the sc-flip and dsc-flip decoders
+            """
+
+            return self.flip_extra_attempts / self.flip_frames if self.flip_frames else 0.0
+
+        def flip_attempt(self, llr, flip_set):
+            self.flips[:] = 0
+            self.flips[list(flip_set)] = 1
+
+            dec_bits = self.fast_ssc_flip_decode(self.n, llr, self.program, self.workspace.alpha_array,
+                                                 self.workspace.beta_array, self.llr_max, self.flips,
+                                                 self.reliabilities)
+
+            if self.enc_mode != 'systematic':
+                dec_bits = self.encode(dec_bits, self.n)
+
+            bits = dec_bits[self.information]
+            crc_pass = np.all(bits[-self.crc.len_bit:] == self.crc(bits[:-self.crc.len_bit]))
+
+            return bits, crc_pass
+
+        def sc_flip_metric(self, flip_set):
+            # Single flips, ranked by the decision reliabilities of the first attempt
+            candidates = np.flatnonzero(np.isfinite(self.reliabilities))
+            return [(self.reliabilities[leaf], (leaf,)) for leaf in candidates]
+
+        def dsc_flip_metric(self, flip_set):
+            # The flip set extended by each decision after its last flipped one, with the reliabilities of its attempt
+            alpha = PolarCoding.Decode.DSC_FLIP_ALPHA
+            candidates = np.isfinite(self.reliabilities)
+
+            penalty = np.zeros(self.reliabilities.shape)
+            penalty[candidates] = np.log1p(np.exp(-alpha * self.reliabilities[candidates])) / alpha
+            metrics = self.reliabilities + np.cumsum(penalty) + np.sum(self.reliabilities[list(flip_set)])
+
+            first_leaf = flip_set[-1] + 1 if flip_set else 0
+            extensions = np.flatnonzero(candidates[first_leaf:]) + first_leaf
+            return [(metrics[leaf], flip_set + (leaf,)) for leaf in extensions]
+
+        def flip_dec(self, llr):
+            """
+            SC-Flip decoding: the frame is decoded again with the least reliable decisions flipped, one flip set at a
+            time, until the CRC passes or the attempts run out. Without a passing CRC, the first attempt is output.
+            """
+
+            self.flip_frames += 1
+
+            first_bits, crc_pass = self.flip_attempt(llr, ())
+            if crc_pass:
+                return first_bits[:-self.crc.len_bit]
+
+            flip_sets = heapq.nsmallest(self.flip_attempts, self.flip_metric(()))
+            heapq.heapify(flip_sets)
+
+            attempts = 0
+            while flip_sets and attempts < self.flip_attempts:
+                metric, flip_set = heapq.heappop(flip_sets)
+
+                bits, crc_pass = self.flip_attempt(llr, flip_set)
+                attempts += 1
+
+                if crc_pass:
+                    self.flip_extra_attempts += attempts
+                    return bits[:-self.crc.len_bit]
+
+                if len(flip_set) < self.flip_order:
+                    for candidate in heapq.nsmallest(self.flip_attempts - attempts, self.flip_metric(flip_set)):
+                        heapq.heappush(flip_sets, candidate)
+
+            self.flip_extra_attempts += attempts
+            return first_bits[:-self.crc.len_bit]
+
+        # Maximum number of iterations of the bp and scan decoders when none is given
+        DEFAULT_ITERATIONS = {'bp': 50, 'scan': 4}
+
+        @property
+        def average_iterations(self):
+            """
+            Average number of iterations per frame of the bp and scan decoders
+            """
+
+            return self.iterations / self.iterative_frames if self.iterative_frames else 0.0
+
+        def bp_iteration(self, left_array, right_array, first):
+            if first:
+                left_array[:, 2 ** self.n:] = 0.0
+                right_array[:] = 0.0
+                right_array[:, self.n * 2 ** self.n + self.frozen] = np.inf
+
+            codewords, messages = self.bp_decode_batch(self.n, left_array, right_array)
+            return (codewords <= 0).astype(np.uint8), (messages <= 0).astype(np.uint8)
+
+        def scan_iteration(self, alpha_array, beta_array, first):
+            if first:
+                beta_array[:, :self.workspace.zero_address] = 0.0
+                beta_array[:, self.workspace.zero_address:] = np.inf
+
+            codewords = (self.scan_decode_batch(self.n, alpha_array, beta_array, self.program) <= 0).astype(np.uint8)
+            return codewords, self.encode_batch(codewords, self.n)
+
+        def early_stop(self, codewords, messages):
+            if self.early_stopping == 'g-matrix':
+                # The decisions are consistent when re-encoding the message gives the codeword, frozen bits included
+                return np.all(self.encode_batch(messages, self.n) == codewords, axis=1) & \
+                    np.all(messages[:, self.frozen] == 0, axis=1)
+
+            elif self.early_stopping == 'crc':
+                bits = (codewords if self.enc_mode == 'systematic' else messages)[:, self.information]
+                return np.all(bits[:, -self.crc.len_bit:] == self.crc(bits[:, :-self.crc.len_bit]), axis=1)
+
+            else:
+                return np.zeros(codewords.shape[0], dtype=bool)
+
+        def iterative_dec(self, llr):
+            return self.iterative_batch_dec(llr[np.newaxis, :])[0]
+
+        def iterative_batch_dec(self, llr):
+            """
+            BP and SCAN decoding: the frames are iterated until their early stopping check passes or the iterations run
+            out, and are then taken out of the batch, so the following iterations only run over the remaining ones.
+            """
+
+            num_frames = llr.shape[0]
+            self.iterative_frames += num_frames
+
+            left_array, right_array = self.workspace.soft_batch(num_frames)
+            left_array[:, :2 ** self.n] = llr
+
+            dec_bits = np.zeros((num_frames, 2 ** self.n), dtype=np.uint8)
+            remaining = np.arange(num_frames)
+
+            for iteration in range(self.max_iterations):
+                codewords, messages = self.iteration(left_array, right_array, iteration == 0)
+
+                if iteration < self.max_iterations - 1:
+                    stop = self.early_stop(codewords, messages)
+
+                else:
+                    stop = np.ones(remaining.size, dtype=bool)
+
+                dec_bits[remaining[stop]] = codewords[stop] if self.enc_mode == 'systematic' else messages[stop]
+                self.iterations += (iteration + 1) * np.count_nonzero(stop)
+
+                if np.all(stop):
+                    break
+
+                if np.any(stop):
+                    remaining = remaining[~stop]
+                    left_array = left_array[~stop]
+                    right_array = right_array[~stop]
+
+            output = dec_bits[:, self.information]
+            if self.crc is not None:
+                output = output[:, :-self.crc.len_bit]
+
+            return output
+
         def ssc_dec(self, llr):
-            dec_bits = self.ssc_decode(self.n, llr, self.tasks, self.address_list)
+            dec_bits = self.ssc_decode(self.n, llr, self.program, self.workspace.alpha_array,
+                                       self.workspace.beta_array, self.llr_max)
             dec_bits = self.encode(dec_bits, self.n)
             return dec_bits[self.information]
 
         def fast_ssc_dec(self, llr):
-            dec_bits = self.fast_ssc_decode(self.n, llr, self.tasks, self.address_list)
+            dec_bits = self.fast_ssc_decode(self.n, llr, self.program, self.workspace.alpha_array,
+                                            self.workspace.beta_array, self.llr_max)
             dec_bits = self.encode(dec_bits, self.n)
             return dec_bits[self.information]
 
+        def fast_ssc_batch_dec(self, llr):
+            alpha_array, beta_array = self.workspace.batch(llr.shape[0])
+            dec_bits = self.fast_ssc_decode_batch(self.n, llr, self.program, alpha_array, beta_array, self.llr_max)
+            dec_bits = self.encode_batch(dec_bits, self.n)
+            return dec_bits[:, self.information]
+
         def sscl_spc_dec(self, llr):
-            betas, metrics, n_paths = self.sscl_spc_decode(self.n, self.list_size, llr, self.tasks, self.address_list)
+            betas, metrics, n_paths = self.sscl_spc_decode(self.n, self.list_size, llr, self.program,
+                                                           self.workspace.alpha_array, self.workspace.beta_array,
+                                                           self.workspace.alpha_pointer_array,
+                                                           self.workspace.beta_pointer_array,
+                                                           self.workspace.metrics, self.fork_limit, self.llr_max)
 
             if self.crc is None:
-                dec_bits = betas[0, :2 ** self.n]
+                final_path = np.argmin(metrics[:n_paths, 0])
+                dec_bits = betas[final_path, :2 ** self.n]
                 dec_bits = self.encode(dec_bits, self.n)
                 output = dec_bits[self.information]
 
@@ -332,13 +794,74 @@ class PolarCoding(object):
                         valid_paths.append(path)
 
                 if valid_paths:
-                    order = np.argsort(metrics[valid_paths, 0])
-                    final_path = valid_paths[order[0]]
+                    final_path = valid_paths[np.argmin(metrics[valid_paths, 0])]
 
                 else:
-                    order = np.argsort(metrics[:n_paths, 0])
-                    final_path = order[0]
+                    final_path = np.argmin(metrics[:n_paths, 0])
 
                 output = code_word[final_path][:-self.crc.len_bit]
 
             return output
+
+    class Workspace(object):
+        def __init__(self, n, size, list_size=None, llr_dtype=np.float64):
+            """
+            Decoder arrays, allocated once and reused across frames
+
+            :param n: tree depth
+            :param size: number of alphas and betas addressed by the decoder layout
+            :param list_size: number of paths kept by list decoders, None for SC decoders
+            :param llr_dtype: dtype of the alphas
+            """
+
+            self.llr_dtype = llr_dtype
+
+            # The zero betas block used by rate-0 nodes is appended after the addressed betas
+            self.zero_address = size
+            self.size = size + 2 ** n // 2
+
+            if list_size is None:
+                self.alpha_array = np.zeros(self.size, dtype=self.llr_dtype)
+                self.beta_array = np.zeros(self.size, dtype=np.uint8)
+
+            else:
+                number_of_slots = 2 * n + 1
+
+                self.alpha_array = np.zeros((list_size, self.size), dtype=self.llr_dtype)
+                self.beta_array = np.zeros((list_size, self.size), dtype=np.uint8)
+                self.alpha_pointer_array = np.zeros((list_size, number_of_slots), dtype=np.uint8)
+                self.beta_pointer_array = np.zeros((list_size, number_of_slots), dtype=np.uint8)
+                self.metrics = np.zeros((list_size, 2), dtype=np.float64)
+
+            self.batch_alpha_array = np.zeros((0, self.size), dtype=self.llr_dtype)
+            self.batch_beta_array = np.zeros((0, self.size), dtype=np.uint8)
+            self.soft_alpha_array = np.zeros((0, self.size), dtype=np.float64)
+            self.soft_beta_array = np.zeros((0, self.size), dtype=np.float64)
+
+        def batch(self, num_frames):
+            """
+            Get the workspace for a batch of frames, growing it if needed
+
+            :param num_frames: number of frames on the batch
+            :return: alphas and betas arrays, one frame per row
+            """
+
+            if self.batch_alpha_array.shape[0] < num_frames:
+                self.batch_alpha_array = np.zeros((num_frames, self.size), dtype=self.llr_dtype)
+                self.batch_beta_array = np.zeros((num_frames, self.size), dtype=np.uint8)
+
+            return self.batch_alpha_array[:num_frames], self.batch_beta_array[:num_frames]
+
+        def soft_batch(self, num_frames):
+            """
+            Get the float64 workspace of the soft-output decoders for a batch of frames, growing it if needed
+
+            :param num_frames: number of frames on the batch
+            :return: alphas and soft betas arrays (or left and right messages), one frame per row
+            """
+
+            if self.soft_alpha_array.shape[0] < num_frames:
+                self.soft_alpha_array = np.zeros((num_frames, self.size), dtype=np.float64)
+                self.soft_beta_array = np.zeros((num_frames, self.size), dtype=np.float64)
+
+            return self.soft_alpha_array[:num_frames], self.soft_beta_array[:num_frames]
@@ -0,0 +1,47 @@
+"""
+Bit packing of the encoder frames.
+
+numpy's packbits has no Pythran counterpart, so these run as plain numpy on both implementation types, around the
+compiled encode_packed.
+
+Created on 18/10/2026 01:57
+"""
+
+import numpy as np
+
+
+def pack_bits(bits, size=None, positions=None):
+    """
+    Pack frames of bits into 64 bit words, the first bit of each word being the least significant one.
+
+    :param bits: 2d array of bits, one frame per row
+    :param size: number of bits per frame, defaults to the number of columns of bits
+    :param positions: positions of the columns of bits in the frame, the other positions being zero. Scattering while
+                      packing spares building the full frames before packing them
+    :return: 2d array of uint64 words, one frame per row, zero padded to a whole word
+    """
+    num_frames = bits.shape[0]
+    if size is None:
+        size = bits.shape[1]
+    num_words = max(size // 64, 1)
+
+    padded = np.zeros((num_frames, 64 * num_words), dtype=np.uint8)
+    if positions is None:
+        padded[:, :size] = bits
+    else:
+        padded[:, positions] = bits
+
+    words = np.packbits(padded, axis=-1, bitorder='little').view('<u8')
+    return words.astype(np.uint64, copy=False)
+
+
+def unpack_bits(words, size):
+    """
+    Unpack frames of bits packed by pack_bits.
+
+    :param words: 2d array of uint64 words, one frame per row
+    :param size: number of bits per frame
+    :return: 2d array of bits, one frame per row
+    """
+    octets = np.ascontiguousarray(words.astype('<u8', copy=False)).view(np.uint8)
+    return np.unpackbits(octets, axis=-1, bitorder='little')[:, :size]
@@ -14,6 +14,20 @@ Note:
     of alphas on the tree is (n + 1) * 2 ** n. This number provides a way of finding the maximum n with 32 bit
     addresses.
 
+    The schedulers output a list of (node_address, task) pairs, which is compiled by the task compiler into a
+    contiguous program before decoding. Each program row carries the operation code and the node addresses resolved
+    from the address list, so the decoders never look up the address list while decoding a frame.
+
+    The decoders do not allocate their alpha and beta arrays; they receive a workspace that is reused across frames.
+    Besides the full layout above, a compact layout is available (see compact_address_list_factory), where only the
+    arrays on the current root-to-leaf path are kept: each level stores one slot for left childs and one for right
+    childs, for a total of 3 * 2 ** n - 2 alphas. Since slots are shared, rate-0 nodes can't rely on their betas
+    being zero, so the compiled program points their betas to a zero block placed at the end of the workspace.
+
+    The alphas may be float64 or fixed-point integers (int8 or int16), following the dtype of the workspace. With
+    integers, the right node operation saturates its output to [-llr_max, llr_max], while the left node operation
+    can't overflow as long as the channel alphas are saturated symmetrically. Path metrics are always float64.
+
 Created on 06/03/2020 16:52
 
 @author: Rodrigo Fischer (rodrigoarfischer@gmail.com)
@@ -23,26 +37,67 @@ import numpy as np
 
 # pythran export fl(float64, float64)
 # pythran export fr(float64, float64, uint8)
+# pythran export saturate(float64, float64)
 
 # pythran export address_list_factory(uint8)
+# pythran export compact_address_list_factory(uint8)
 # pythran export ssc_node_classifier(uint8, uint32[:], uint32[:])
 # pythran export fast_ssc_node_classifier(uint8, uint32[:], uint32[:])
+# pythran export extended_node_classifier(uint8, uint32[:], uint32[:])
 # not able to export ssc_scheduler(uint8, uint8[:])
 # not able to export fast_ssc_scheduler(uint8, uint8[:])
 # not able to export sscl_spc_scheduler(uint8, uint8[:])
-
-# pythran export alpha_left(float64[:], uint32[:, :], uint32)
-# pythran export alpha_right(float64[:], uint8[:], uint32[:, :], uint32)
-# pythran export betas(uint8[:], uint32[:, :], uint32)
-# pythran export alpha_left_custom(float64[:], float64[:], uint32[:, :], uint32)
-# pythran export alpha_right_custom(float64[:], float64[:], uint8[:], uint32[:, :], uint32)
-# pythran export betas_custom(uint8[:], uint8[:], uint8[:], uint32[:, :], uint32)
+# pythran export task_compiler(uint32 list list, uint32[:, :], uint8[:], uint32)
+
+# pythran export alpha_left(float64[:], uint32[:])
+# pythran export alpha_left(int8[:], uint32[:])
+# pythran export alpha_left(int16[:], uint32[:])
+# pythran export alpha_right(float64[:], uint8[:], uint32[:], float64)
+# pythran export alpha_right(int8[:], uint8[:], uint32[:], float64)
+# pythran export alpha_right(int16[:], uint8[:], uint32[:], float64)
+# pythran export betas(uint8[:], uint32[:])
+# pythran export alpha_left_custom(float64[:], float64[:], uint32[:])
+# pythran export alpha_left_custom(int8[:], int8[:], uint32[:])
+# pythran export alpha_left_custom(int16[:], int16[:], uint32[:])
+# pythran export alpha_right_custom(float64[:], float64[:], uint8[:], uint32[:], float64)
+# pythran export alpha_right_custom(int8[:], int8[:], uint8[:], uint32[:], float64)
+# pythran export alpha_right_custom(int16[:], int16[:], uint8[:], uint32[:], float64)
+# pythran export betas_custom(uint8[:], uint8[:], uint8[:], uint32[:])
+# pythran export path_selection(float64[:], int)
 
 # pythran export encode(uint8[:], uint8)
-
-# pythran export ssc_decode(uint8, float64[:], uint32 list list, uint32[:, :])
-# pythran export fast_ssc_decode(uint8, float64[:], uint32 list list, uint32[:, :])
-# pythran export sscl_spc_decode(uint8, uint8, float64[:], uint32 list list, uint32[:, :])
+# pythran export encode_batch(uint8[:, :], uint8)
+# pythran export encode_packed(uint64[:, :], uint8)
+
+# The decoders are exported for the float64, int8 and int16 LLR formats. The list decoder takes C-ordered workspaces
+# only, as each layout of its 2-D arguments is otherwise exported as a separate overload
+# pythran export ssc_decode(uint8, float64[:], uint32[:, :], float64[:], uint8[:], float64)
+# pythran export ssc_decode(uint8, int8[:], uint32[:, :], int8[:], uint8[:], float64)
+# pythran export ssc_decode(uint8, int16[:], uint32[:, :], int16[:], uint8[:], float64)
+# pythran export fast_ssc_decode(uint8, float64[:], uint32[:, :], float64[:], uint8[:], float64)
+# pythran export fast_ssc_decode(uint8, int8[:], uint32[:, :], int8[:], uint8[:], float64)
+# pythran export fast_ssc_decode(uint8, int16[:], uint32[:, :], int16[:], uint8[:], float64)
+# pythran export fast_ssc_flip_decode(uint8, float64[:], uint32[:, :], float64[:], uint8[:], float64, uint8[:],
+#                                     float64[:])
+# pythran export fast_ssc_flip_decode(uint8, int8[:], uint32[:, :], int8[:], uint8[:], float64, uint8[:], float64[:])
+# pythran export fast_ssc_flip_decode(uint8, int16[:], uint32[:, :], int16[:], uint8[:], float64, uint8[:], float64[:])
+# pythran export fast_ssc_decode_batch(uint8, float64[:, :], uint32[:, :], float64[:, :], uint8[:, :], float64)
+# pythran export fast_ssc_decode_batch(uint8, int8[:, :], uint32[:, :], int8[:, :], uint8[:, :], float64)
+# pythran export fast_ssc_decode_batch(uint8, int16[:, :], uint32[:, :], int16[:, :], uint8[:, :], float64)
+# pythran export sscl_spc_decode(uint8, uint8, float64[:], uint32[:, :] order(C), float64[:, :] order(C),
+#                                uint8[:, :] order(C), uint8[:, :] order(C), uint8[:, :] order(C),
+#                                float64[:, :] order(C), int, float64)
+# pythran export sscl_spc_decode(uint8, uint8, int8[:], uint32[:, :] order(C), int8[:, :] order(C),
+#                                uint8[:, :] order(C), uint8[:, :] order(C), uint8[:, :] order(C),
+#                                float64[:, :] order(C), int, float64)
+# pythran export sscl_spc_decode(uint8, uint8, int16[:], uint32[:, :] order(C), int16[:, :] order(C),
+#                                uint8[:, :] order(C), uint8[:, :] order(C), uint8[:, :] order(C),
+#                                float64[:, :] order(C), int, float64)
+# pythran export genie_sc_decode_batch(uint8, float64[:, :], uint8[:, :], uint32[:, :], float64[:, :], uint8[:, :])
+
+# The soft-output decoders only take float64 alphas
+# pythran export scan_decode_batch(uint8, float64[:, :], float64[:, :], uint32[:, :])
+# pythran export bp_decode_batch(uint8, float64[:, :], float64[:, :])
 
 
 # Base functions
@@ -57,7 +112,14 @@ def fr(a, b, c):
     """
     The right node operation. Depends on the node bit.
     """
-    return b + (1 - 2 * c) * a
+    return b + (1.0 - 2.0 * c) * a
+
+
+def saturate(a, llr_max):
+    """
+    Clip a value to the LLR range [-llr_max, llr_max].
+    """
+    return min(max(a, -llr_max), llr_max)
 
 
 # Factory functions
@@ -77,8 +139,9 @@ def address_list_factory(n):
     :param n: tree depth
     :return: 2d ndarray
     """
-    array_start_list = np.zeros((2 ** (n + 1) - 1, 2), dtype=np.uint32)
-    child_array_start_list = np.zeros((2 ** (n + 1) - 1, 7), dtype=np.uint32)
+    # The shapes come from integer shifts, as the powers of the uint8 depth are floats on Pythran
+    array_start_list = np.zeros(((2 << n) - 1, 2), dtype=np.uint32)
+    child_array_start_list = np.zeros(((2 << n) - 1, 7), dtype=np.uint32)
 
     for i in range(1, n + 1):
         for j in range(2 ** i - 1, 2 * (2 ** i - 1) + 1):
@@ -102,41 +165,93 @@ def address_list_factory(n):
     return child_array_start_list
 
 
-def ssc_node_classifier(n, information, frozen):
+def compact_address_list_factory(n):
     """
-    Classify each node. 0 means rate-0, 1 means rate-1 and 2 means neither.
+    Build the helping address array for the compact workspace layout.
+
+    The columns are the same as on address_list_factory, but the starting addresses are remapped so that every tree
+    level holds only two slots, one shared by all the left childs and one shared by all the right childs of the
+    level. The root node keeps its 2 ** n slot, for a total of 3 * 2 ** n - 2 addresses.
+
+    :param n: tree depth
+    :return: 2d ndarray
+    """
+    address_list = address_list_factory(n)
+    start_list = np.zeros((2 << n) - 1, dtype=np.uint32)
+
+    level_start = 2 ** n
+    for i in range(1, n + 1):
+        step = 2 ** (n - i)
+        for j in range(2 ** i - 1, 2 * (2 ** i - 1) + 1):
+            start_list[j] = level_start + ((j - (2 ** i - 1)) % 2) * step
+
+        level_start += 2 * step
+
+    for i in range(2 ** (n + 1) - 1):
+        address_list[i, 0] = start_list[i]
+        address_list[i, 4] = start_list[(i + 1) * 2 ** address_list[i, 6] - 1]
+
+        if i < 2 ** n - 1:
+            address_list[i, 1] = start_list[2 * i + 1]
+            address_list[i, 2] = start_list[2 * (i + 1)]
+
+    return address_list
+
+
+def leaf_sheet(n, information, frozen, unset):
+    """
+    Classify the tree leaves. 0 means frozen, 1 means information and unset means neither.
 
     :param n: tree depth
     :param information: list containing information indexes
     :param frozen: list containing frozen indexes
-    :return: linear array containing if the node is rate-0, rate-1 or neither
+    :param unset: value of the leaves neither on information nor on frozen
+    :return: linear array over the whole tree, where only the leaves are set
     """
-    ilist = [i + 2 ** n - 1 for i in information]
-    flist = [f + 2 ** n - 1 for f in frozen]
+    # The sizes come from integer shifts, as the powers of the uint8 depth are floats on Pythran
+    rate_sheet = np.zeros((2 << n) - 1, dtype=np.uint8)
 
-    rate_sheet = np.zeros(2 ** (n + 1) - 1, dtype=np.uint8)
+    # Boolean masks over the leaves replace the membership tests on the index lists
+    information_mask = np.zeros(1 << n, dtype=np.bool_)
+    information_mask[information] = True
 
-    for i in range(2 ** n - 1, 2 ** (n + 1) - 1):
-        if i in ilist:
-            rate_sheet[i] = 1
+    frozen_mask = np.zeros(1 << n, dtype=np.bool_)
+    frozen_mask[frozen] = True
 
-        elif i in flist:
-            rate_sheet[i] = 0
+    leaves = np.full(1 << n, unset, dtype=np.uint8)
+    leaves[frozen_mask] = 0
+    leaves[information_mask] = 1
 
-        else:
-            # This case should never be reached
-            rate_sheet[i] = 2
+    rate_sheet[(1 << n) - 1:] = leaves
+
+    return rate_sheet
+
+
+def ssc_node_classifier(n, information, frozen):
+    """
+    Classify each node. 0 means rate-0, 1 means rate-1 and 2 means neither.
+
+    The tree is classified bottom-up, one level at a time, with array operations over the childs of the level.
+
+    :param n: tree depth
+    :param information: list containing information indexes
+    :param frozen: list containing frozen indexes
+    :return: linear array containing if the node is rate-0, rate-1 or neither
+    """
+    rate_sheet = leaf_sheet(n, information, frozen, 2)
 
     for j in range(n):
-        for i in range(2 ** (n - j - 1) - 1, 2 ** (n - j) - 1):
-            if rate_sheet[2 * i + 1] == 1 and rate_sheet[2 * i + 2] == 1:
-                rate_sheet[i] = 1
+        level_size = (1 << n) >> (j + 1)
+        level_start = level_size - 1
 
-            elif rate_sheet[2 * i + 1] == 0 and rate_sheet[2 * i + 2] == 0:
-                rate_sheet[i] = 0
+        left = rate_sheet[2 * level_start + 1: 2 * level_start + 2 * level_size + 1: 2]
+        right = rate_sheet[2 * level_start + 2: 2 * level_start + 2 * level_size + 2: 2]
 
-            else:
-                rate_sheet[i] = 2
+        level = np.full(level_size, 2, dtype=np.uint8)
+        level[(left == 1) & (right == 1)] = 1
+        level[(left == 0) & (right == 0)] = 0
+
+        rate_sheet[level_start: level_start + level_size] = level
 
     return rate_sheet
 
@@ -151,49 +266,126 @@ def fast_ssc_node_classifier(n, information, frozen):
     - 3: SPC
     - 4: neither
 
+    The tree is classified bottom-up, one level at a time, with array operations over the childs of the level.
+
     :param n: tree depth
     :param information: list containing information indexes
     :param frozen: list containing frozen indexes
     :return: linear array containing the node information
     """
-    ilist = [i + 2 ** n - 1 for i in information]
-    flist = [f + 2 ** n - 1 for f in frozen]
+    rate_sheet = leaf_sheet(n, information, frozen, 4)
+
+    for j in range(n):
+        level_size = (1 << n) >> (j + 1)
+        level_start = level_size - 1
 
-    rate_sheet = np.zeros(2 ** (n + 1) - 1, dtype=np.uint8)
+        left = rate_sheet[2 * level_start + 1: 2 * level_start + 2 * level_size + 1: 2]
+        right = rate_sheet[2 * level_start + 2: 2 * level_start + 2 * level_size + 2: 2]
 
-    for i in range(2 ** n - 1, 2 ** (n + 1) - 1):
-        if i in ilist:
-            rate_sheet[i] = 1
+        level = np.full(level_size, 4, dtype=np.uint8)
 
-        elif i in flist:
-            rate_sheet[i] = 0
+        if j == 0:
+            level[(left == 0) & (right == 1)] = 2
+
+        elif j == 1:
+            level[(left == 2) & (right == 1)] = 3
 
         else:
-            # This case should never be reached
-            rate_sheet[i] = 4
+            level[(left == 3) & (right == 1)] = 3
+
+        level[(left == 0) & (right == 2)] = 2
+        level[(left == 1) & (right == 1)] = 1
+        level[(left == 0) & (right == 0)] = 0
+
+        rate_sheet[level_start: level_start + level_size] = level
+
+    return rate_sheet
+
+
+def extended_node_classifier(n, information, frozen):
+    """
+    Classify each node, including the extended node types.
+
+    - 0: rate-0
+    - 1: rate-1
+    - 2: REP
+    - 3: SPC
+    - 4: neither
+    - 5: Type-I, information only on the last two leaves (size 4 and up)
+    - 6: Type-II, information only on the last three leaves (size 8 and up)
+    - 7: Type-III, frozen only on the first two leaves (size 8 and up)
+    - 8: Type-IV, frozen only on the first three leaves (size 8 and up)
+    - 9: Type-V, Type-II left child and SPC right child (size 16 and up)
+    - 10: REP-SPC, REP left child and SPC right child (size 8 and up)
+    - 11: G-REP, rate-0 except for the rightmost descendant at some level, which is rate-1 or SPC
+    - 12: G-PC, rate-1 except for the leftmost descendant at some level, which is rate-0
+
+    Where a node fits on more than one definition, the first one on the list above is taken, e.g. the size 4 node
+    with the two last leaves as information is Type-I, not Type-III, and the Type-I and Type-II nodes are also G-REP
+    nodes. The tree is classified bottom-up, one level at a time, with array operations over the childs of the level.
+
+    :param n: tree depth
+    :param information: list containing information indexes
+    :param frozen: list containing frozen indexes
+    :return: linear array containing the node information
+    """
+    rate_sheet = leaf_sheet(n, information, frozen, 4)
+
+    # Whether the node leaves are a block of frozen leaves followed by information leaves only, where the block size
+    # is a power of two. These nodes are G-PC nodes unless they fit on an earlier type.
+    frozen_prefix = rate_sheet == 0
 
     for j in range(n):
-        for i in range(2 ** (n - j - 1) - 1, 2 ** (n - j) - 1):
-            if rate_sheet[2 * i + 1] == 1 and rate_sheet[2 * i + 2] == 1:
-                rate_sheet[i] = 1
+        level_size = (1 << n) >> (j + 1)
+        level_start = level_size - 1
 
-            elif rate_sheet[2 * i + 1] == 0 and rate_sheet[2 * i + 2] == 0:
-                rate_sheet[i] = 0
+        left = rate_sheet[2 * level_start + 1: 2 * level_start + 2 * level_size + 1: 2]
+        right = rate_sheet[2 * level_start + 2: 2 * level_start + 2 * level_size + 2: 2]
+        left_frozen_prefix = frozen_prefix[2 * level_start + 1: 2 * level_start + 2 * level_size + 1: 2]
 
-            elif rate_sheet[2 * i + 1] == 0 and rate_sheet[2 * i + 2] == 2:
-                rate_sheet[i] = 2
+        level = np.full(level_size, 4, dtype=np.uint8)
 
-            elif j == 0 and rate_sheet[2 * i + 1] == 0 and rate_sheet[2 * i + 2] == 1:
-                rate_sheet[i] = 2
+        # The rules are applied from the last to the first type, so the first matching type is kept
+        level[left_frozen_prefix & (left != 0) & (right == 1)] = 12
+        level[(left == 0) & ((right == 1) | (right == 3) | (right == 5) | (right == 6) | (right == 11))] = 11
 
-            elif j == 1 and rate_sheet[2 * i + 1] == 2 and rate_sheet[2 * i + 2] == 1:
-                rate_sheet[i] = 3
+        if j >= 2:
+            level[(left == 2) & (right == 3)] = 10
 
-            elif j > 1 and rate_sheet[2 * i + 1] == 3 and rate_sheet[2 * i + 2] == 1:
-                rate_sheet[i] = 3
+        if j >= 3:
+            level[(left == 6) & (right == 3)] = 9
 
-            else:
-                rate_sheet[i] = 4
+        if j == 2:
+            level[(left == 2) & (right == 1)] = 8
+            level[(left == 5) & (right == 1)] = 7
+            level[(left == 0) & (right == 3)] = 6
+
+        elif j > 2:
+            level[(left == 8) & (right == 1)] = 8
+            level[(left == 7) & (right == 1)] = 7
+            level[(left == 0) & (right == 6)] = 6
+
+        if j == 1:
+            level[(left == 0) & (right == 1)] = 5
+
+        elif j > 1:
+            level[(left == 0) & (right == 5)] = 5
+
+        if j == 0:
+            level[(left == 0) & (right == 1)] = 2
+
+        elif j == 1:
+            level[(left == 2) & (right == 1)] = 3
+
+        else:
+            level[(left == 3) & (right == 1)] = 3
+
+        level[(left == 0) & (right == 2)] = 2
+        level[(left == 1) & (right == 1)] = 1
+        level[(left == 0) & (right == 0)] = 0
+
+        rate_sheet[level_start: level_start + level_size] = level
+        frozen_prefix[level_start: level_start + level_size] = (level == 0) | (left_frozen_prefix & (right == 1))
 
     return rate_sheet
 
@@ -266,7 +458,31 @@ def ssc_scheduler(n, node_sheet):
     return tasks
 
 
-def fast_ssc_scheduler(n, node_sheet):
+def special_node_task(node_sheet, node, opcode):
+    """
+    Define the task of a special node, carrying the descendant node that sets the G-REP and G-PC code structure.
+
+    :param node_sheet: array containing the node classification, obtained by the extended node classifier
+    :param node: node address
+    :param opcode: special node operation code
+    :return: task, as [node_address, operation_code, descendant_address]
+    """
+    descendant = node
+
+    # G-REP nodes repeat their rightmost rate-1 or SPC descendant
+    if opcode == 8:
+        while node_sheet[descendant] != 1 and node_sheet[descendant] != 3:
+            descendant = 2 * descendant + 2
+
+    # G-PC nodes are set by their leftmost rate-0 descendant
+    elif opcode == 9:
+        while node_sheet[descendant] != 0:
+            descendant = 2 * descendant + 1
+
+    return [node, opcode, descendant]
+
+
+def fast_ssc_scheduler(n, node_sheet, special_opcodes=None):
     """
     Define the decoding steps for the Fast-SSC. Each tuple represents (node_address, task).
     Suitable for systematic encoding, since the schedule ends with the betas at the root node.
@@ -279,12 +495,18 @@ def fast_ssc_scheduler(n, node_sheet):
         - 4: compute node betas from child betas
         - 5: compute alphas left
         - 6: compute alpha right
+        - 8 and up: compute betas from alphas at special node (see special_node_betas)
 
     :param n: tree depth
     :param node_sheet: array containing the node classification, obtained by the node classifiers
+    :param special_opcodes: dictionary from the extended node types to their operation codes; extended node types
+        out of it are decoded through their childs
     :return: 2d array, where the first column is the node address and the second column is the operation code
     """
 
+    if special_opcodes is None:
+        special_opcodes = {}
+
     # Flag that states whether the node is completely decoded or not
     node_flags = np.zeros(2 ** (n + 1) - 1, dtype=np.uint8)
 
@@ -297,9 +519,12 @@ def fast_ssc_scheduler(n, node_sheet):
     tasks = []
 
     # Start task scheduling
-    if node_sheet[0] != 4:
+    if node_sheet[0] < 4:
         tasks.append([0, node_sheet[0]])
 
+    elif node_sheet[0] in special_opcodes:
+        tasks.append(special_node_task(node_sheet, 0, special_opcodes[node_sheet[0]]))
+
     else:
         nptr = 0
         stop = False
@@ -324,6 +549,11 @@ def fast_ssc_scheduler(n, node_sheet):
                 node_flags[nptr] = 1
                 nptr = parent
 
+            elif node_sheet[nptr] in special_opcodes:
+                tasks.append(special_node_task(node_sheet, nptr, special_opcodes[node_sheet[nptr]]))
+                node_flags[nptr] = 1
+                nptr = parent
+
             else:
                 if node_flags[left_child] == 1 and node_flags[right_child] == 1:
                     tasks.append([nptr, 4])
@@ -343,7 +573,7 @@ def fast_ssc_scheduler(n, node_sheet):
     return tasks
 
 
-def sscl_spc_scheduler(n, node_sheet):
+def sscl_spc_scheduler(n, node_sheet, special_opcodes=None):
     """
     Define the decoding steps for the SSCL-SPC decoding. Each tuple represents (node_address, task).
     Suitable for systematic encoding, since the schedule ends with the betas at the root node.
@@ -357,12 +587,19 @@ def sscl_spc_scheduler(n, node_sheet):
         - 5: compute node betas from child betas
         - 6: compute alphas left
         - 7: compute alpha right
+        - 8: compute betas from alphas at G-REP node
+        - 9: compute betas from alphas at G-PC node
 
     :param n: tree depth
     :param node_sheet: array containing the node classification, obtained by the node classifiers
+    :param special_opcodes: dictionary from the extended node types to their operation codes; extended node types
+        out of it are decoded through their childs
     :return: 2d array, where the first column is the node address and the second column is the operation code
     """
 
+    if special_opcodes is None:
+        special_opcodes = {}
+
     # Flag that states whether the node is completely decoded or not
     node_flags = np.zeros(2 ** (n + 1) - 1, dtype=np.uint8)
 
@@ -370,9 +607,12 @@ def sscl_spc_scheduler(n, node_sheet):
     tasks = []
 
     # Start task scheduling
-    if node_sheet[0] != 4:
+    if node_sheet[0] < 4:
         tasks.append([0, node_sheet[0]])
 
+    elif node_sheet[0] in special_opcodes:
+        tasks.append(special_node_task(node_sheet, 0, special_opcodes[node_sheet[0]]))
+
     else:
         nptr = 0
         stop = False
@@ -402,6 +642,11 @@ def sscl_spc_scheduler(n, node_sheet):
                 node_flags[nptr] = 1
                 nptr = parent
 
+            elif node_sheet[nptr] in special_opcodes:
+                tasks.append(special_node_task(node_sheet, nptr, special_opcodes[node_sheet[nptr]]))
+                node_flags[nptr] = 1
+                nptr = parent
+
             else:
                 if node_flags[left_child] == 1 and node_flags[right_child] == 1:
                     tasks.append([nptr, 5])
@@ -421,117 +666,228 @@ def sscl_spc_scheduler(n, node_sheet):
     return tasks
 
 
+def task_compiler(tasks, address_list, node_sheet, zero_address):
+    """
+    Compile the scheduled tasks into a contiguous program with the node addresses already resolved.
+
+    The betas of rate-0 childs are read from zero_address, which should point to a block of at least 2 ** (n - 1)
+    zeros that is never written.
+
+    On the return, each row is a task and each column represents
+        - 0: operation code
+        - 1: node address
+        - 2: node starting address of alpha or beta array
+        - 3: left child starting address of alpha or beta array
+        - 4: right child starting address of alpha or beta array
+        - 5: child alpha or beta array size
+        - 6: node alpha or beta array size (number of leaf children)
+        - 7: left child starting address of beta array
+        - 8: right child starting address of beta array
+        - 9: node slot
+        - 10: left child slot
+        - 11: right child slot
+        - 12: special node descendant size
+        - 13: special node descendant type
+
+    A slot identifies a tree level and side: the root is the slot 0 and the left and right childs at depth d are the
+    slots 2 * d - 1 and 2 * d. Only one node per slot is active at a time, so the list decoder keeps its path pointers
+    per slot.
+
+    :param tasks: tasks from task scheduler
+    :param address_list: helper address list
+    :param node_sheet: array containing the node classification, obtained by the node classifiers
+    :param zero_address: starting address of the zero betas block
+    :return: 2d ndarray
+    """
+
+    program = np.zeros((len(tasks), 14), dtype=np.uint32)
+    n = address_list[0, 6]
+
+    for i in range(len(tasks)):
+        node = tasks[i][0]
+
+        program[i, 0] = tasks[i][1]
+        program[i, 1] = node
+        program[i, 2] = address_list[node, 0]
+        program[i, 3] = address_list[node, 1]
+        program[i, 4] = address_list[node, 2]
+        program[i, 5] = address_list[node, 3]
+        program[i, 6] = address_list[node, 5]
+        program[i, 7] = address_list[node, 1]
+        program[i, 8] = address_list[node, 2]
+
+        depth = n - address_list[node, 6]
+        if node > 0:
+            program[i, 9] = 2 * depth - node % 2
+
+        if node < len(node_sheet) // 2:
+            program[i, 10] = 2 * depth + 1
+            program[i, 11] = 2 * depth + 2
+
+            if node_sheet[2 * node + 1] == 0:
+                program[i, 7] = zero_address
+
+            if node_sheet[2 * node + 2] == 0:
+                program[i, 8] = zero_address
+
+        if len(tasks[i]) > 2:
+            descendant = tasks[i][2]
+            program[i, 12] = address_list[descendant, 5]
+            program[i, 13] = node_sheet[descendant]
+
+    return program
+
+
 # Decoding functions
-def alpha_left(alpha_array, address_list, node_id):
+def alpha_left(alpha_array, task):
     """
     Compute the left alphas.
 
     :param alpha_array: linear array containing the alphas
-    :param address_list: helper address list
-    :param node_id: base node address
+    :param task: compiled task, from the task compiler
     """
-    start_h = address_list[node_id, 0]
-    start_l = address_list[node_id, 1]
-    step = address_list[node_id, 3]
+    start_h = task[2]
+    start_l = task[3]
+    step = task[5]
     for i in range(0, step):
         alpha_array[start_l + i] = fl(alpha_array[start_h + i],
                                       alpha_array[start_h + i + step])
 
 
-def alpha_right(alpha_array, beta_array, address_list, node_id):
+def alpha_right(alpha_array, beta_array, task, llr_max):
     """
     Compute the right alphas.
 
     :param alpha_array: linear array containing the alphas
     :param beta_array: linear array containing the betas
-    :param address_list: helper address list
-    :param node_id: base node address
+    :param task: compiled task, from the task compiler
+    :param llr_max: saturation value of the alphas
     """
-    start_h = address_list[node_id, 0]
-    start_ll = address_list[node_id, 1]
-    start_lr = address_list[node_id, 2]
-    step = address_list[node_id, 3]
+    start_h = task[2]
+    start_ll = task[7]
+    start_lr = task[4]
+    step = task[5]
     for i in range(0, step):
-        alpha_array[start_lr + i] = fr(alpha_array[start_h + i],
-                                       alpha_array[start_h + i + step],
-                                       beta_array[start_ll + i])
+        alpha_array[start_lr + i] = saturate(fr(alpha_array[start_h + i],
+                                                alpha_array[start_h + i + step],
+                                                beta_array[start_ll + i]), llr_max)
 
 
-def betas(beta_array, address_list, node_id):
+def betas(beta_array, task):
     """
     Compute the betas.
 
     :param beta_array: linear array containing the betas
-    :param address_list: helper address list
-    :param node_id: base node address
+    :param task: compiled task, from the task compiler
     """
-    start_h = address_list[node_id, 0]
-    start_ll = address_list[node_id, 1]
-    start_lr = address_list[node_id, 2]
-    step = address_list[node_id, 3]
+    start_h = task[2]
+    start_ll = task[7]
+    start_lr = task[8]
+    step = task[5]
 
     for i in range(0, step):
         beta_array[start_h + i] = beta_array[start_ll + i] ^ beta_array[start_lr + i]
         beta_array[start_h + i + step] = beta_array[start_lr + i]
 
 
-def alpha_left_custom(parent_alphas, child_alphas, address_list, node_id):
+def alpha_left_custom(parent_alphas, child_alphas, task):
     """
     Compute the left alphas.
 
     :param parent_alphas: linear array containing the alphas of the parent node
     :param child_alphas: linear array containing the alphas of the child node
-    :param address_list: helper address list
-    :param node_id: base node address
+    :param task: compiled task, from the task compiler
     """
-    start_h = address_list[node_id, 0]
-    start_l = address_list[node_id, 1]
-    step = address_list[node_id, 3]
+    start_h = task[2]
+    start_l = task[3]
+    step = task[5]
     for i in range(0, step):
         child_alphas[start_l + i] = fl(parent_alphas[start_h + i],
                                        parent_alphas[start_h + i + step])
 
 
-def alpha_right_custom(parent_alphas, child_alphas, beta_array, address_list, node_id):
+def alpha_right_custom(parent_alphas, child_alphas, beta_array, task, llr_max):
     """
     Compute the right alphas.
 
     :param parent_alphas: linear array containing the alphas of the parent node
     :param child_alphas: linear array containing the alphas of the child node
     :param beta_array: linear array containing the betas
-    :param address_list: helper address list
-    :param node_id: base node address
+    :param task: compiled task, from the task compiler
+    :param llr_max: saturation value of the alphas
     """
-    start_h = address_list[node_id, 0]
-    start_ll = address_list[node_id, 1]
-    start_lr = address_list[node_id, 2]
-    step = address_list[node_id, 3]
+    start_h = task[2]
+    start_ll = task[7]
+    start_lr = task[4]
+    step = task[5]
     for i in range(0, step):
-        child_alphas[start_lr + i] = fr(parent_alphas[start_h + i],
-                                        parent_alphas[start_h + i + step],
-                                        beta_array[start_ll + i])
+        child_alphas[start_lr + i] = saturate(fr(parent_alphas[start_h + i],
+                                                 parent_alphas[start_h + i + step],
+                                                 beta_array[start_ll + i]), llr_max)
 
 
-def betas_custom(parent_betas, child_betas_left, child_betas_right, address_list, node_id):
+def betas_custom(parent_betas, child_betas_left, child_betas_right, task):
     """
     Compute the betas.
 
     :param parent_betas: linear array containing the betas of the parent node
     :param child_betas_left: linear array containing the betas of the left child node
     :param child_betas_right: linear array containing the betas of the right child node
-    :param address_list: helper address list
-    :param node_id: base node address
+    :param task: compiled task, from the task compiler
     """
-    start_h = address_list[node_id, 0]
-    start_ll = address_list[node_id, 1]
-    start_lr = address_list[node_id, 2]
-    step = address_list[node_id, 3]
+    start_h = task[2]
+    start_ll = task[7]
+    start_lr = task[8]
+    step = task[5]
 
     for i in range(0, step):
         parent_betas[start_h + i] = child_betas_left[start_ll + i] ^ child_betas_right[start_lr + i]
         parent_betas[start_h + i + step] = child_betas_right[start_lr + i]
 
 
+def path_selection(path_metrics, num_select):
+    """
+    Select the paths with the smallest metrics, with a quickselect in expected linear time.
+
+    :param path_metrics: linear array containing the candidate path metrics
+    :param num_select: number of paths to select
+    :return: indexes of the selected paths, in no particular order
+    """
+    size = path_metrics.shape[0]
+    order = np.arange(size)
+
+    left = 0
+    right = size - 1
+    k = num_select - 1
+    while left < right and num_select < size:
+        pivot = path_metrics[order[(left + right) // 2]]
+
+        i = left
+        j = right
+        while i <= j:
+            while path_metrics[order[i]] < pivot:
+                i += 1
+
+            while path_metrics[order[j]] > pivot:
+                j -= 1
+
+            if i <= j:
+                order[i], order[j] = order[j], order[i]
+                i += 1
+                j -= 1
+
+        if k <= j:
+            right = j
+
+        elif k >= i:
+            left = i
+
+        else:
+            break
+
+    return order[:num_select]
+
+
 # Encoding function
 def encode(bits, n):
     """
@@ -551,8 +907,251 @@ def encode(bits, n):
     return stage_input
 
 
+def encode_batch(bits, n):
+    """
+    Perform polar encoding over a batch of frames.
+
+    Each butterfly stage is applied as a single XOR over all the frames of the batch.
+
+    :param bits: 2d array of bits to encode, one frame per row
+    :param n: tree depth
+    :return: encoded bits, one frame per row
+    """
+    num_frames = bits.shape[0]
+    stage_input = np.copy(bits)
+    for i in range(n):
+        # Integer shifts, as the powers of the uint8 depth are floats on Pythran
+        half = 1 << (int(n) - i - 1)
+        stage_view = stage_input.reshape((num_frames, 1 << i, 2, half))
+        stage_view[:, :, 0, :] ^= stage_view[:, :, 1, :]
+
+    return stage_input
+
+
+def encode_packed(words, n):
+    """
+    Perform polar encoding over a batch of bit packed frames.
+
+    The butterfly stages are independent of each other, so they can be applied in any order. The 6 stages spanning
+    less than a word are applied inside each word, through shifts and the precomputed lane masks selecting the upper
+    bits of each butterfly. The remaining stages XOR whole words, one stage at a time over all the frames.
+
+    :param words: 2d array of uint64 words, from bit_packing.pack_bits
+    :param n: tree depth
+    :return: encoded words
+    """
+    lane_masks = np.array([0x5555555555555555, 0x3333333333333333, 0x0F0F0F0F0F0F0F0F,
+                           0x00FF00FF00FF00FF, 0x0000FFFF0000FFFF, 0x00000000FFFFFFFF], dtype=np.uint64)
+
+    num_frames = words.shape[0]
+    num_words = words.shape[1]
+    encoded = np.copy(words)
+
+    # Integer shifts, as the powers of the uint8 depth are floats on Pythran
+    for i in range(min(n, 6)):
+        encoded ^= (encoded >> np.uint64(1 << i)) & lane_masks[i]
+
+    for i in range(6, n):
+        half = 1 << (int(i) - 6)
+        stage_view = encoded.reshape((num_frames, num_words // (2 * half), 2, half))
+        stage_view[:, :, 0, :] ^= stage_view[:, :, 1, :]
+
+    return encoded
+
+
+# Special node functions
+def rep_betas(alphas):
+    """
+    Decode REP nodes, one frame per row.
+
+    :param alphas: node alphas, one frame per row
+    :return: node betas, one frame per row
+    """
+    decision_bits = np.sum(alphas, axis=1) <= 0
+
+    node_betas = np.zeros(alphas.shape, dtype=np.uint8)
+    for i in range(alphas.shape[1]):
+        node_betas[:, i] = decision_bits
+
+    return node_betas
+
+
+def spc_betas(alphas):
+    """
+    Decode SPC nodes, one frame per row. The least reliable bit is flipped when the hard decisions have odd parity.
+
+    :param alphas: node alphas, one frame per row
+    :return: node betas, one frame per row
+    """
+    node_betas = np.zeros(alphas.shape, dtype=np.uint8)
+    node_betas[:] = alphas <= 0
+
+    parity = np.sum(node_betas, axis=1) % 2
+
+    min_idx = np.argmin(np.abs(alphas), axis=1)
+
+    # Pythran has no fancy indexing with several index arrays, so the flips go through the flat view
+    flat_betas = node_betas.reshape(-1)
+    flat_betas[np.arange(alphas.shape[0]) * alphas.shape[1] + min_idx] ^= parity.astype(np.uint8)
+
+    return node_betas
+
+
+def g_rep_betas(alphas, child_size, child_type):
+    """
+    Decode G-REP nodes, one frame per row.
+
+    The node codeword repeats the codeword of its rightmost descendant, which is decoded from the sum of the
+    alphas of every repetition.
+
+    :param alphas: node alphas, one frame per row
+    :param child_size: size of the rightmost descendant
+    :param child_type: rightmost descendant node type, 1 for rate-1 and 3 for SPC
+    :return: node betas, one frame per row
+    """
+    size = alphas.shape[1]
+
+    child_alphas = np.zeros((alphas.shape[0], child_size), dtype=np.float64)
+    for block in range(0, size, child_size):
+        child_alphas += alphas[:, block: block + child_size]
+
+    if child_type == 3:
+        child_betas = spc_betas(child_alphas)
+
+    else:
+        child_betas = np.zeros(child_alphas.shape, dtype=np.uint8)
+        child_betas[:] = child_alphas <= 0
+
+    node_betas = np.zeros(alphas.shape, dtype=np.uint8)
+    for block in range(0, size, child_size):
+        node_betas[:, block: block + child_size] = child_betas
+
+    return node_betas
+
+
+def g_pc_betas(alphas, child_size):
+    """
+    Decode G-PC nodes, one frame per row.
+
+    With a rate-0 leftmost descendant of size child_size, the bits spaced by child_size form independent SPC codes.
+
+    :param alphas: node alphas, one frame per row
+    :param child_size: size of the rate-0 leftmost descendant
+    :return: node betas, one frame per row
+    """
+    size = alphas.shape[1]
+
+    node_betas = np.zeros(alphas.shape, dtype=np.uint8)
+    for j in range(child_size):
+        node_betas[:, j: size: child_size] = spc_betas(alphas[:, j: size: child_size])
+
+    return node_betas
+
+
+def type_iv_betas(alphas):
+    """
+    Decode Type-IV nodes, one frame per row.
+
+    The bits spaced by 4 form four SPC codes whose parity is the same information bit. The parity with the smallest
+    cost is taken, and the least reliable bit of each code not meeting it is flipped.
+
+    :param alphas: node alphas, one frame per row
+    :return: node betas, one frame per row
+    """
+    num_frames = alphas.shape[0]
+    size = alphas.shape[1]
+
+    node_betas = np.zeros(alphas.shape, dtype=np.uint8)
+    node_betas[:] = alphas <= 0
+
+    parity = np.zeros((num_frames, 4), dtype=np.uint8)
+    min_alphas = np.zeros((num_frames, 4), dtype=np.float64)
+    min_idx = np.zeros((num_frames, 4), dtype=np.int64)
+    for j in range(4):
+        parity[:, j] = np.sum(node_betas[:, j: size: 4], axis=1) % 2
+        min_alphas[:, j] = np.min(np.abs(alphas[:, j: size: 4]), axis=1)
+        min_idx[:, j] = j + 4 * np.argmin(np.abs(alphas[:, j: size: 4]), axis=1)
+
+    cost_even = np.sum(min_alphas * parity, axis=1)
+    cost_odd = np.sum(min_alphas * (1 - parity), axis=1)
+    target = (cost_even > cost_odd).astype(np.uint8)
+
+    flips = np.zeros((num_frames, 4), dtype=np.uint8)
+    flips[:] = parity != target.reshape((num_frames, 1))
+    flip_idx = np.arange(num_frames).reshape((num_frames, 1)) * size + min_idx
+
+    flat_betas = node_betas.reshape(-1)
+    flat_betas[flip_idx.reshape(-1)] ^= flips.reshape(-1)
+
+    return node_betas
+
+
+def rep_spc_betas(alphas, left_type, llr_max):
+    """
+    Decode REP-SPC and Type-V nodes, one frame per row, by SC decoding of their childs.
+
+    :param alphas: node alphas, one frame per row
+    :param left_type: left child node type, 2 for REP and 6 for Type-II
+    :param llr_max: saturation value of the alphas
+    :return: node betas, one frame per row
+    """
+    step = alphas.shape[1] // 2
+    upper = alphas[:, :step]
+    lower = alphas[:, step:]
+
+    left_alphas = np.sign(upper) * np.sign(lower) * np.minimum(np.abs(upper), np.abs(lower))
+
+    if left_type == 6:
+        left_betas = g_rep_betas(left_alphas, 4, 3)
+
+    else:
+        left_betas = rep_betas(left_alphas)
+
+    right_alphas = np.clip(lower + (1.0 - 2.0 * left_betas) * upper, -llr_max, llr_max)
+    right_betas = spc_betas(right_alphas)
+
+    node_betas = np.zeros(alphas.shape, dtype=np.uint8)
+    node_betas[:, :step] = left_betas ^ right_betas
+    node_betas[:, step:] = right_betas
+
+    return node_betas
+
+
+def special_node_betas(alphas, task, llr_max):
+    """
+    Decode the special nodes, one frame per row.
+
+    Special node tasks
+        - 8: G-REP, also Type-I and Type-II
+        - 9: G-PC, also Type-III
+        - 10: Type-IV
+        - 11: Type-V
+        - 12: REP-SPC
+
+    :param alphas: float64 node alphas, one frame per row
+    :param task: compiled task, from the task compiler
+    :param llr_max: saturation value of the alphas
+    :return: node betas, one frame per row
+    """
+    # The uint32 task fields are cast, as Pythran can't mix them with the int64 shapes of the alphas
+    if task[0] == 8:
+        return g_rep_betas(alphas, int(task[12]), int(task[13]))
+
+    elif task[0] == 9:
+        return g_pc_betas(alphas, int(task[12]))
+
+    elif task[0] == 10:
+        return type_iv_betas(alphas)
+
+    elif task[0] == 11:
+        return rep_spc_betas(alphas, 6, llr_max)
+
+    else:
+        return rep_spc_betas(alphas, 2, llr_max)
+
+
 # Decoding functions
-def ssc_decode(n, alphas, tasks, address_list):
+def ssc_decode(n, alphas, program, alpha_array, beta_array, llr_max):
     """
     Perform the SSC polar decoding.
 
@@ -560,39 +1159,38 @@ def ssc_decode(n, alphas, tasks, address_list):
 
     :param n: tree depth
     :param alphas: channel alphas
-    :param tasks: tasks from task scheduler
-    :param address_list: helper address list
+    :param program: compiled tasks, from the task compiler
+    :param alpha_array: alphas workspace
+    :param beta_array: betas workspace
+    :param llr_max: saturation value of the alphas
     :return: decoded bits
     """
 
-    size = (n + 1) * 2 ** n
-    alpha_array = np.zeros(size, dtype=np.float64)
     alpha_array[:2 ** n] = alphas
-    beta_array = np.zeros(size, dtype=np.uint8)
 
-    for task in tasks:
+    for task in program:
 
-        if task[1] == 1:
-            start_h = address_list[task[0], 0]
-            size = address_list[task[0], 5]
+        if task[0] == 1:
+            start_h = task[2]
+            size = task[6]
             node_betas = np.array([0 if alpha > 0 else 1 for alpha in alpha_array[start_h: start_h + size]],
                                   dtype=np.uint8)
 
             beta_array[start_h: start_h + size] = node_betas
 
-        elif task[1] == 2:
-            betas(beta_array, address_list, task[0])
+        elif task[0] == 2:
+            betas(beta_array, task)
 
-        elif task[1] == 3:
-            alpha_left(alpha_array, address_list, task[0])
+        elif task[0] == 3:
+            alpha_left(alpha_array, task)
 
-        elif task[1] == 4:
-            alpha_right(alpha_array, beta_array, address_list, task[0])
+        elif task[0] == 4:
+            alpha_right(alpha_array, beta_array, task, llr_max)
 
     return beta_array[:2 ** n]
 
 
-def fast_ssc_decode(n, alphas, tasks, address_list):
+def fast_ssc_decode(n, alphas, program, alpha_array, beta_array, llr_max):
     """
     Perform the Fast-SSC polar decoding.
 
@@ -600,38 +1198,37 @@ def fast_ssc_decode(n, alphas, tasks, address_list):
 
     :param n: tree depth
     :param alphas: channel alphas
-    :param tasks: tasks from task scheduler
-    :param address_list: helper address list
+    :param program: compiled tasks, from the task compiler
+    :param alpha_array: alphas workspace
+    :param beta_array: betas workspace
+    :param llr_max: saturation value of the alphas
     :return: decoded bits
     """
 
-    size = (n + 1) * 2 ** n
-    alpha_array = np.zeros(size, dtype=np.float64)
     alpha_array[:2 ** n] = alphas
-    beta_array = np.zeros(size, dtype=np.uint8)
 
-    for task in tasks:
+    for task in program:
 
-        if task[1] == 1:
-            start_h = address_list[task[0], 0]
-            size = address_list[task[0], 5]
+        if task[0] == 1:
+            start_h = task[2]
+            size = task[6]
             node_betas = np.array([0 if alpha > 0 else 1 for alpha in alpha_array[start_h: start_h + size]],
                                   dtype=np.uint8)
 
             beta_array[start_h: start_h + size] = node_betas
 
-        elif task[1] == 2:
-            start_h = address_list[task[0], 0]
-            size = address_list[task[0], 5]
+        elif task[0] == 2:
+            start_h = task[2]
+            size = task[6]
 
-            decision_llr = np.sum(alpha_array[start_h: start_h + size])
+            decision_llr = np.sum(alpha_array[start_h: start_h + size].astype(np.float64))
             decision_bit = 0 if decision_llr > 0 else 1
 
             beta_array[start_h: start_h + size] = decision_bit * np.ones(size, dtype=np.uint8)
 
-        elif task[1] == 3:
-            start_h = address_list[task[0], 0]
-            size = address_list[task[0], 5]
+        elif task[0] == 3:
+            start_h = task[2]
+            size = task[6]
             node_betas = np.array([0 if alpha > 0 else 1 for alpha in alpha_array[start_h: start_h + size]],
                                   dtype=np.uint8)
 
@@ -643,110 +1240,667 @@ def fast_ssc_decode(n, alphas, tasks, address_list):
 
             beta_array[start_h: start_h + size] = node_betas
 
-        elif task[1] == 4:
-            betas(beta_array, address_list, task[0])
+        elif task[0] == 4:
+            betas(beta_array, task)
+
+        elif task[0] == 5:
+            alpha_left(alpha_array, task)
 
-        elif task[1] == 5:
-            alpha_left(alpha_array, address_list, task[0])
+        elif task[0] == 6:
+            alpha_right(alpha_array, beta_array, task, llr_max)
 
-        elif task[1] == 6:
-            alpha_right(alpha_array, beta_array, address_list, task[0])
+        elif task[0] >= 8:
+            start_h = task[2]
+            size = task[6]
+            node_alphas = alpha_array[start_h: start_h + size].astype(np.float64).reshape((1, int(size)))
+
+            beta_array[start_h: start_h + size] = special_node_betas(node_alphas, task, llr_max)[0, :]
 
     return beta_array[:2 ** n]
 
 
-# TODO: currently, for rate-0 nodes the metrics are not sorted after being updated
-#   therefore, if the last node is rate-0 (very unlikely), the 0-th element of the beta_array
-#   is not the one with the smallest path.
-def sscl_spc_decode(n, list_size, alphas, tasks, address_list):
+def fast_ssc_flip_decode(n, alphas, program, alpha_array, beta_array, llr_max, flips, reliabilities):
     """
-    Perform systematic list decoding.
+    Perform the Fast-SSC polar decoding with flipped decisions, for the SC-Flip decoders.
+
+    Decisions are identified by the leftmost leaf of their node plus their position on the node: each bit of a
+    rate-1 node, the single decision of a REP node (on its last leaf) and each bit of a SPC node but its least
+    reliable one, whose flip also flips the least reliable bit to keep the parity. Special nodes don't flip.
+
+    Suitable for systematic encoding.
 
     :param n: tree depth
-    :param list_size: maximum list size
     :param alphas: channel alphas
-    :param tasks: tasks from task scheduler
-    :param address_list: helper address list
+    :param program: compiled tasks, from the task compiler
+    :param alpha_array: alphas workspace
+    :param beta_array: betas workspace
+    :param llr_max: saturation value of the alphas
+    :param flips: 1 on the decisions to flip, one per leaf
+    :param reliabilities: absolute decision alphas, one per leaf, filled on the return; inf where there is no
+        decision to flip
     :return: decoded bits
     """
 
-    size = (n + 1) * 2 ** n
-    alpha_array = np.zeros((list_size, size), dtype=np.float64)
-    alpha_array[0, :2 ** n] = alphas
-    beta_array = np.zeros((list_size, size), dtype=np.uint8)
+    alpha_array[:2 ** n] = alphas
+    reliabilities[:] = np.inf
 
-    # This limits the number of paths to 256
-    number_of_nodes = 2 ** (n + 1) - 1
-    alpha_pointer_array = np.zeros((list_size, number_of_nodes), dtype=np.uint8)
-    beta_pointer_array = np.zeros((list_size, number_of_nodes), dtype=np.uint8)
+    for task in program:
 
-    metrics = np.zeros((list_size, 2), dtype=np.float64)
-    num_paths = 1
+        if task[0] == 1:
+            start_h = task[2]
+            size = task[6]
+            first_leaf = (task[1] + 1) * size - 2 ** n
+            node_alphas = alpha_array[start_h: start_h + size]
 
-    for task in tasks:
-        if task[1] == 1:
+            node_betas = np.zeros(size, dtype=np.uint8)
+            node_betas[:] = node_alphas <= 0
 
-            parent_node = int(task[0])
-            start_h = address_list[parent_node, 0]
-            size = address_list[parent_node, 5]
-            node_betas = np.zeros((list_size, size), dtype=np.uint8)
+            beta_array[start_h: start_h + size] = node_betas ^ flips[first_leaf: first_leaf + size]
+            reliabilities[first_leaf: first_leaf + size] = np.abs(node_alphas)
+
+        elif task[0] == 2:
+            start_h = task[2]
+            size = task[6]
+            last_leaf = (task[1] + 1) * size - 2 ** n + size - 1
+
+            decision_llr = np.sum(alpha_array[start_h: start_h + size].astype(np.float64))
+            decision_bit = (0 if decision_llr > 0 else 1) ^ flips[last_leaf]
+
+            beta_array[start_h: start_h + size] = decision_bit * np.ones(size, dtype=np.uint8)
+            reliabilities[last_leaf] = abs(decision_llr)
+
+        elif task[0] == 3:
+            start_h = task[2]
+            size = task[6]
+            first_leaf = (task[1] + 1) * size - 2 ** n
+            node_alphas = alpha_array[start_h: start_h + size]
+
+            node_betas = np.zeros(size, dtype=np.uint8)
+            node_betas[:] = node_alphas <= 0
+            node_betas ^= flips[first_leaf: first_leaf + size]
+
+            parity = np.sum(node_betas) % 2
+
+            min_idx = np.argmin(np.abs(node_alphas))
+
+            node_betas[min_idx] = (node_betas[min_idx] + parity) % 2
+
+            beta_array[start_h: start_h + size] = node_betas
+            reliabilities[first_leaf: first_leaf + size] = np.abs(node_alphas)
+            reliabilities[first_leaf + min_idx] = np.inf
+
+        elif task[0] == 4:
+            betas(beta_array, task)
+
+        elif task[0] == 5:
+            alpha_left(alpha_array, task)
+
+        elif task[0] == 6:
+            alpha_right(alpha_array, beta_array, task, llr_max)
+
+        elif task[0] >= 8:
+            start_h = task[2]
+            size = task[6]
+            node_alphas = alpha_array[start_h: start_h + size].astype(np.float64).reshape((1, int(size)))
+
+            beta_array[start_h: start_h + size] = special_node_betas(node_alphas, task, llr_max)[0, :]
+
+    return beta_array[:2 ** n]
+
+
+def fast_ssc_decode_batch(n, alphas, program, alpha_array, beta_array, llr_max):
+    """
+    Perform the Fast-SSC polar decoding over a batch of frames.
+
+    The same schedule is shared by every frame, so each task is executed once as an array operation over the frame
+    axis. Suitable for systematic encoding.
+
+    :param n: tree depth
+    :param alphas: channel alphas, one frame per row
+    :param program: compiled tasks, from the task compiler
+    :param alpha_array: alphas workspace, one frame per row
+    :param beta_array: betas workspace, one frame per row
+    :param llr_max: saturation value of the alphas
+    :return: decoded bits, one frame per row
+    """
+
+    num_frames = alphas.shape[0]
+    alpha_array[:, :2 ** n] = alphas
+
+    for task in program:
+
+        if task[0] == 1:
+            start_h = task[2]
+            size = task[6]
+
+            beta_array[:, start_h: start_h + size] = alpha_array[:, start_h: start_h + size] <= 0
+
+        elif task[0] == 2:
+            start_h = task[2]
+            size = task[6]
+
+            decision_bits = np.sum(alpha_array[:, start_h: start_h + size].astype(np.float64), axis=1) <= 0
 
             for i in range(size):
+                beta_array[:, start_h + i] = decision_bits
 
-                num_final_paths = min(2 * num_paths, list_size)
-                next_metrics = np.zeros((2 * num_paths, 4), dtype=np.float64)
+        elif task[0] == 3:
+            start_h = task[2]
+            size = task[6]
+            node_alphas = alpha_array[:, start_h: start_h + size]
+            node_betas = np.zeros((num_frames, size), dtype=np.uint8)
+            node_betas[:] = node_alphas <= 0
 
-                for idx in range(num_paths):
-                    alpha_path = alpha_pointer_array[int(metrics[idx, 1]), parent_node]
-                    alpha = alpha_array[alpha_path, start_h + i]
-                    metric = metrics[idx, 0]
+            parity = np.sum(node_betas, axis=1) % 2
 
-                    pm0 = metric + 1 / 2 * (abs(alpha) - alpha)
-                    pm1 = metric + 1 / 2 * (abs(alpha) + alpha)
+            min_idx = np.argmin(np.abs(node_alphas), axis=1)
 
-                    next_metrics[2 * idx, :] = [idx, alpha_path, 0.0, pm0]
-                    next_metrics[2 * idx + 1, :] = [idx, alpha_path, 1.0, pm1]
+            flat_betas = node_betas.reshape(-1)
+            flat_betas[np.arange(num_frames) * size + min_idx] ^= parity.astype(np.uint8)
 
-                metrics_order = np.argsort(next_metrics[:, 3])[:num_final_paths]
-                final_paths = next_metrics[metrics_order]
+            beta_array[:, start_h: start_h + size] = node_betas
 
-                old_node_betas = np.copy(node_betas)
-                for idx, path in enumerate(final_paths):
-                    old_idx = int(path[0])
-                    alpha_path = path[1]
-                    value = np.uint8(path[2])
-                    metric = path[3]
+        elif task[0] == 4:
+            start_h = task[2]
+            start_ll = task[7]
+            start_lr = task[8]
+            step = task[5]
 
-                    node_betas[idx, :] = old_node_betas[old_idx, :]
-                    node_betas[idx, i] = value
+            beta_array[:, start_h: start_h + step] = beta_array[:, start_ll: start_ll + step] ^ \
+                beta_array[:, start_lr: start_lr + step]
+            beta_array[:, start_h + step: start_h + 2 * step] = beta_array[:, start_lr: start_lr + step]
 
-                    metrics[idx, :] = [metric, alpha_path]
+        elif task[0] == 5:
+            start_h = task[2]
+            start_l = task[3]
+            step = task[5]
+            upper = alpha_array[:, start_h: start_h + step]
+            lower = alpha_array[:, start_h + step: start_h + 2 * step]
 
-                num_paths = num_final_paths
+            alpha_array[:, start_l: start_l + step] = np.sign(upper) * np.sign(lower) * \
+                np.minimum(np.abs(upper), np.abs(lower))
+
+        elif task[0] == 6:
+            start_h = task[2]
+            start_ll = task[7]
+            start_lr = task[4]
+            step = task[5]
+
+            right_alphas = alpha_array[:, start_h + step: start_h + 2 * step] + \
+                (1.0 - 2.0 * beta_array[:, start_ll: start_ll + step]) * alpha_array[:, start_h: start_h + step]
+
+            alpha_array[:, start_lr: start_lr + step] = np.clip(right_alphas, -llr_max, llr_max)
+
+        elif task[0] >= 8:
+            start_h = task[2]
+            size = task[6]
+            node_alphas = alpha_array[:, start_h: start_h + size].astype(np.float64)
+
+            beta_array[:, start_h: start_h + size] = special_node_betas(node_alphas, task, llr_max)
+
+    return beta_array[:, :2 ** n]
+
+
+def genie_sc_decode_batch(n, alphas, bits, program, alpha_array, beta_array):
+    """
+    Perform genie-aided SC decoding over a batch of frames, counting the decision errors of each bit channel.
+
+    Every leaf takes its hard decision, which is compared to the transmitted bit. The transmitted bit is then used as
+    the leaf beta, as if all the previous decisions were right, so each count only depends on its own bit channel.
+
+    :param n: tree depth
+    :param alphas: channel alphas, one frame per row
+    :param bits: transmitted bits before the polar transform, one frame per row
+    :param program: compiled tasks of the SSC schedule where every leaf is a rate-1 node and no other node is
+    :param alpha_array: alphas workspace, one frame per row
+    :param beta_array: betas workspace, one frame per row
+    :return: number of decision errors of each bit channel
+    """
+
+    # An integer shift, as the powers of the uint8 depth are floats on Pythran
+    size = 1 << int(n)
+    errors = np.zeros(size, dtype=np.int64)
+    alpha_array[:, :size] = alphas
+
+    for task in program:
+
+        if task[0] == 1:
+            # Pythran only indexes the columns with int64 indexes
+            start_h = int(task[2])
+            leaf = int(task[1]) - (size - 1)
+
+            decisions = alpha_array[:, start_h] <= 0
+            errors[leaf] += np.sum(decisions != bits[:, leaf])
+
+            beta_array[:, start_h] = bits[:, leaf]
+
+        elif task[0] == 2:
+            start_h = task[2]
+            start_ll = task[7]
+            start_lr = task[8]
+            step = task[5]
+
+            beta_array[:, start_h: start_h + step] = beta_array[:, start_ll: start_ll + step] ^ \
+                beta_array[:, start_lr: start_lr + step]
+            beta_array[:, start_h + step: start_h + 2 * step] = beta_array[:, start_lr: start_lr + step]
+
+        elif task[0] == 3:
+            start_h = task[2]
+            start_l = task[3]
+            step = task[5]
+            upper = alpha_array[:, start_h: start_h + step]
+            lower = alpha_array[:, start_h + step: start_h + 2 * step]
+
+            alpha_array[:, start_l: start_l + step] = np.sign(upper) * np.sign(lower) * \
+                np.minimum(np.abs(upper), np.abs(lower))
+
+        elif task[0] == 4:
+            start_h = task[2]
+            start_ll = task[7]
+            start_lr = task[4]
+            step = task[5]
+
+            alpha_array[:, start_lr: start_lr + step] = alpha_array[:, start_h + step: start_h + 2 * step] + \
+                (1.0 - 2.0 * beta_array[:, start_ll: start_ll + step]) * alpha_array[:, start_h: start_h + step]
+
+    return errors
+
+
+def scan_decode_batch(n, alpha_array, beta_array, program):
+    """
+    Perform one iteration of the SCAN soft-output polar decoding over a batch of frames.
+
+    The SSC schedule is run with soft betas: each node feeds back the LLRs of its bits instead of hard decisions, and
+    the left alphas also take the right child betas of the previous iteration. The betas of rate-1 nodes are zero
+    and the ones of rate-0 nodes are infinite, read from the block at the zero address, so their subtrees are not
+    traversed. The betas are kept between iterations, which requires the full memory layout.
+
+    :param n: tree depth
+    :param alpha_array: alphas workspace with the channel alphas at the root, one frame per row
+    :param beta_array: soft betas workspace, one frame per row
+    :param program: compiled tasks of the SSC schedule
+    :return: soft output of the codeword bits, one frame per row
+    """
+
+    for task in program:
+
+        if task[0] == 1:
+            start_h = task[2]
+            size = task[6]
+
+            beta_array[:, start_h: start_h + size] = 0.0
+
+        elif task[0] == 2:
+            start_h = task[2]
+            start_ll = task[7]
+            start_lr = task[8]
+            step = task[5]
+            upper = alpha_array[:, start_h: start_h + step]
+            lower = alpha_array[:, start_h + step: start_h + 2 * step]
+            left_betas = beta_array[:, start_ll: start_ll + step]
+            right_betas = beta_array[:, start_lr: start_lr + step]
+
+            lower_betas = right_betas + lower
+            beta_array[:, start_h: start_h + step] = np.sign(left_betas) * np.sign(lower_betas) * \
+                np.minimum(np.abs(left_betas), np.abs(lower_betas))
+            beta_array[:, start_h + step: start_h + 2 * step] = np.sign(left_betas) * np.sign(upper) * \
+                np.minimum(np.abs(left_betas), np.abs(upper)) + right_betas
+
+        elif task[0] == 3:
+            start_h = task[2]
+            start_l = task[3]
+            start_lr = task[8]
+            step = task[5]
+            upper = alpha_array[:, start_h: start_h + step]
+            lower = alpha_array[:, start_h + step: start_h + 2 * step] + beta_array[:, start_lr: start_lr + step]
+
+            alpha_array[:, start_l: start_l + step] = np.sign(upper) * np.sign(lower) * \
+                np.minimum(np.abs(upper), np.abs(lower))
+
+        elif task[0] == 4:
+            start_h = task[2]
+            start_ll = task[7]
+            start_r = task[4]
+            step = task[5]
+            upper = alpha_array[:, start_h: start_h + step]
+            left_betas = beta_array[:, start_ll: start_ll + step]
+
+            alpha_array[:, start_r: start_r + step] = np.sign(upper) * np.sign(left_betas) * \
+                np.minimum(np.abs(upper), np.abs(left_betas)) + alpha_array[:, start_h + step: start_h + 2 * step]
+
+    return alpha_array[:, :2 ** n] + beta_array[:, :2 ** n]
+
+
+def bp_decode_batch(n, left_array, right_array):
+    """
+    Perform one iteration of the belief propagation polar decoding over a batch of frames.
+
+    The factor graph stages are the tree levels of the full memory layout: the level at depth d holds its 2 ** n
+    messages at d * 2 ** n, each node on the same addresses as its alphas. An iteration propagates the left messages
+    from the channel (depth 0) to the leaves (depth n), and then the right messages back, level by level, as array
+    operations over all the nodes of the level and all the frames.
+
+    :param n: tree depth
+    :param left_array: messages towards the leaves, with the channel alphas at depth 0, one frame per row
+    :param right_array: messages towards the channel, with the frozen bits infinite at depth n, one frame per row
+    :return: soft outputs of the codeword bits and of the bits before the polar transform, one frame per row
+    """
+
+    # Integer shifts, as the powers of the uint8 depth are floats on Pythran
+    num_frames = left_array.shape[0]
+    block = 1 << int(n)
+
+    for depth in range(n):
+        step = block >> (depth + 1)
+        nodes = block // (2 * step)
+        parent = left_array[:, depth * block: (depth + 1) * block].reshape((num_frames, nodes, 2 * step))
+        childs = right_array[:, (depth + 1) * block: (depth + 2) * block].reshape((num_frames, nodes, 2 * step))
+        upper = parent[:, :, :step]
+        lower = parent[:, :, step:]
+        left_childs = childs[:, :, :step]
+        right_childs = childs[:, :, step:]
+
+        lower_right = lower + right_childs
+        messages = np.zeros((num_frames, nodes, 2 * step))
+        messages[:, :, :step] = np.sign(upper) * np.sign(lower_right) * np.minimum(np.abs(upper), np.abs(lower_right))
+        messages[:, :, step:] = np.sign(upper) * np.sign(left_childs) * \
+            np.minimum(np.abs(upper), np.abs(left_childs)) + lower
+
+        left_array[:, (depth + 1) * block: (depth + 2) * block] = messages.reshape((num_frames, block))
+
+    for depth in range(n - 1, -1, -1):
+        step = block >> (depth + 1)
+        nodes = block // (2 * step)
+        parent = left_array[:, depth * block: (depth + 1) * block].reshape((num_frames, nodes, 2 * step))
+        childs = right_array[:, (depth + 1) * block: (depth + 2) * block].reshape((num_frames, nodes, 2 * step))
+        upper = parent[:, :, :step]
+        lower = parent[:, :, step:]
+        left_childs = childs[:, :, :step]
+        right_childs = childs[:, :, step:]
+
+        lower_right = lower + right_childs
+        messages = np.zeros((num_frames, nodes, 2 * step))
+        messages[:, :, :step] = np.sign(left_childs) * np.sign(lower_right) * \
+            np.minimum(np.abs(left_childs), np.abs(lower_right))
+        messages[:, :, step:] = np.sign(left_childs) * np.sign(upper) * \
+            np.minimum(np.abs(left_childs), np.abs(upper)) + right_childs
+
+        right_array[:, depth * block: (depth + 1) * block] = messages.reshape((num_frames, block))
+
+    codeword = left_array[:, :block] + right_array[:, :block]
+    message = left_array[:, n * block: (n + 1) * block] + right_array[:, n * block: (n + 1) * block]
+
+    return codeword, message
+
+
+def list_rate_1_forks(node_alphas, metrics, num_paths, list_size, fork_limit):
+    """
+    Fork the paths over the bits of a rate-1 node.
+
+    :param node_alphas: node alphas of every workspace row, one row per alpha row
+    :param metrics: path metrics, where the second column holds the alpha row of each path
+    :param num_paths: number of paths
+    :param list_size: maximum list size
+    :param fork_limit: maximum number of forked bits
+    :return: node betas of the surviving paths, the path each one comes from and the number of paths
+    """
+    size = node_alphas.shape[1]
+    num_forks = min(fork_limit, size)
+    decisions = np.zeros((num_forks, list_size), dtype=np.uint8)
+    parent_paths = np.zeros((num_forks, list_size), dtype=np.uint8)
+
+    fork_bits = np.zeros((list_size, num_forks), dtype=np.int64)
+
+    if num_forks < size:
+        # Only the alpha rows of the active paths are forked, and only their least reliable bits are sorted
+        for idx in range(num_paths):
+            row = int(metrics[idx, 1])
+            reliabilities = np.abs(node_alphas[row, :])
+            candidates = path_selection(reliabilities, num_forks)
+            fork_bits[row, :] = candidates[np.argsort(reliabilities[candidates])]
+
+    else:
+        for row in range(list_size):
+            fork_bits[row, :] = np.arange(size)
+
+    for i in range(num_forks):
+
+        num_final_paths = min(2 * num_paths, list_size)
+        next_metrics = np.zeros((2 * num_paths, 4), dtype=np.float64)
+
+        for idx in range(num_paths):
+            alpha_path = metrics[idx, 1]
+            alpha = float(node_alphas[int(alpha_path), fork_bits[int(alpha_path), i]])
+            metric = metrics[idx, 0]
+
+            pm0 = metric + 1 / 2 * (abs(alpha) - alpha)
+            pm1 = metric + 1 / 2 * (abs(alpha) + alpha)
+
+            next_metrics[2 * idx, :] = [idx, alpha_path, 0.0, pm0]
+            next_metrics[2 * idx + 1, :] = [idx, alpha_path, 1.0, pm1]
+
+        metrics_order = path_selection(next_metrics[:, 3], num_final_paths)
+        final_paths = next_metrics[metrics_order]
+
+        for idx, path in enumerate(final_paths):
+            parent_paths[i, idx] = np.uint8(path[0])
+            decisions[i, idx] = np.uint8(path[2])
+
+            metrics[idx, :] = [path[3], path[1]]
+
+        num_paths = num_final_paths
+
+    node_betas = np.zeros((num_paths, size), dtype=np.uint8)
+    entry_paths = np.zeros(num_paths, dtype=np.uint8)
+    for idx in range(num_paths):
+        alpha_path = int(metrics[idx, 1])
+        node_betas[idx, :] = node_alphas[alpha_path, :] <= 0
+
+        path = idx
+        for i in range(num_forks - 1, -1, -1):
+            node_betas[idx, fork_bits[alpha_path, i]] = decisions[i, path]
+            path = parent_paths[i, path]
+
+        entry_paths[idx] = path
+
+    return node_betas, entry_paths, num_paths
+
+
+def list_spc_forks(node_alphas, metrics, num_paths, list_size, fork_limit):
+    """
+    Fork the paths over the bits of a SPC node. The least reliable bit satisfies the parity constraint.
+
+    :param node_alphas: node alphas of every workspace row, one row per alpha row
+    :param metrics: path metrics, where the second column holds the alpha row of each path
+    :param num_paths: number of paths
+    :param list_size: maximum list size
+    :param fork_limit: maximum number of forked bits besides the parity bit
+    :return: node betas of the surviving paths, the path each one comes from and the number of paths
+    """
+    size = node_alphas.shape[1]
+    num_forks = min(fork_limit, size - 1)
+    decisions = np.zeros((num_forks, list_size), dtype=np.uint8)
+    parent_paths = np.zeros((num_forks, list_size), dtype=np.uint8)
+
+    fork_bits = np.zeros((list_size, num_forks), dtype=np.int64)
+
+    if num_forks < size - 1:
+        idx_min = np.zeros(node_alphas.shape[0], dtype=np.int64)
+        for idx in range(num_paths):
+            row = int(metrics[idx, 1])
+            reliabilities = np.abs(node_alphas[row, :])
+            candidates = path_selection(reliabilities, num_forks + 1)
+            reliability_order = candidates[np.argsort(reliabilities[candidates])]
+            idx_min[row] = reliability_order[0]
+            fork_bits[row, :] = reliability_order[1:]
+
+    else:
+        idx_min = np.argmin(np.abs(node_alphas), axis=-1).flatten()
+        for row in range(list_size):
+            for i in range(size - 1):
+                fork_bits[row, i] = i + 1 if idx_min[row] <= i else i
+
+    parity_array = np.ones(node_alphas.shape, dtype=np.uint8)
+    parity_array[node_alphas >= 0] = 0
+    parity = np.sum(parity_array, axis=-1) % 2
+    min_alphas = np.min(np.abs(node_alphas), axis=-1)
+
+    for idx in range(num_paths):
+        alpha_path = int(metrics[idx, 1])
+        metrics[idx, 0] = metrics[idx, 0] + min_alphas[alpha_path] if parity[alpha_path] else metrics[idx, 0]
+
+    for i in range(num_forks):
+
+        num_final_paths = min(2 * num_paths, list_size)
+        next_metrics = np.zeros((2 * num_paths, 4), dtype=np.float64)
+
+        for idx in range(num_paths):
+            alpha_path = metrics[idx, 1]
+            alpha = float(node_alphas[int(alpha_path), fork_bits[int(alpha_path), i]])
+            metric = metrics[idx, 0]
+
+            pm0 = metric + abs(alpha) \
+                if alpha < 0 else metric
+            pm1 = metric + abs(alpha) \
+                if alpha >= 0 else metric
+
+            next_metrics[2 * idx, :] = [idx, alpha_path, 0.0, pm0]
+            next_metrics[2 * idx + 1, :] = [idx, alpha_path, 1.0, pm1]
+
+        metrics_order = path_selection(next_metrics[:, 3], num_final_paths)
+        final_paths = next_metrics[metrics_order]
+
+        for idx, path in enumerate(final_paths):
+            parent_paths[i, idx] = np.uint8(path[0])
+            decisions[i, idx] = np.uint8(path[2])
+
+            metrics[idx, :] = [path[3], path[1]]
+
+        num_paths = num_final_paths
+
+    node_betas = np.zeros((num_paths, size), dtype=np.uint8)
+    entry_paths = np.zeros(num_paths, dtype=np.uint8)
+    for idx in range(num_paths):
+        alpha_path = int(metrics[idx, 1])
+        node_betas[idx, :] = parity_array[alpha_path, :]
+        node_betas[idx, idx_min[alpha_path]] = 0
+
+        path = idx
+        for i in range(num_forks - 1, -1, -1):
+            node_betas[idx, fork_bits[alpha_path, i]] = decisions[i, path]
+            path = parent_paths[i, path]
+
+        # The least reliable bit satisfies the parity constraint
+        node_betas[idx, idx_min[alpha_path]] = np.sum(node_betas[idx, :]) % 2
+        entry_paths[idx] = path
+
+    return node_betas, entry_paths, num_paths
+
+
+def list_update_paths(node_betas, entry_paths, num_paths, metrics, alpha_pointer_array, beta_pointer_array,
+                      beta_array, task):
+    """
+    Point the surviving paths to the rows of the paths they come from, and store their node betas on their own rows.
+
+    :param node_betas: node betas of the surviving paths
+    :param entry_paths: path each surviving path comes from
+    :param num_paths: number of surviving paths
+    :param metrics: path metrics, where the second column is set to the alpha row of each path
+    :param alpha_pointer_array: alpha pointers workspace
+    :param beta_pointer_array: beta pointers workspace
+    :param beta_array: betas workspace
+    :param task: compiled task, from the task compiler
+    """
+    node_slot = task[9]
+    start_h = task[2]
+    size = task[6]
+
+    old_alpha_pointer_array = np.copy(alpha_pointer_array)
+    old_beta_pointer_array = np.copy(beta_pointer_array)
+    for idx in range(num_paths):
+        path = entry_paths[idx]
+        metrics[idx, 1] = idx
+
+        alpha_pointer_array[idx, :] = old_alpha_pointer_array[path, :]
+        beta_pointer_array[idx, :] = old_beta_pointer_array[path, :]
+        beta_pointer_array[idx, node_slot] = idx
+        beta_array[idx, start_h:start_h + size] = node_betas[idx, :]
+
+
+def sscl_spc_decode(n, list_size, alphas, program, alpha_array, beta_array, alpha_pointer_array, beta_pointer_array,
+                    metrics, fork_limit, llr_max):
+    """
+    Perform systematic list decoding.
+
+    Paths are lazily copied: each path keeps, for every tree slot (see task_compiler), a pointer to the workspace row
+    holding its alphas and betas. A forked path shares the rows of its parent path and writes only on its own row,
+    so forking copies 2 * n + 1 pointers instead of the arrays. Inside rate-1 and SPC nodes, the bit decisions are
+    stored along with the index of the parent path, and the node betas of each surviving path are traced back once
+    the node is decoded.
+
+    At each fork, the surviving paths are selected without sorting the candidates, so the output paths are not
+    ordered by their metrics.
+
+    The fork limit enables the Fast-SSCL pruning: rate-1 nodes only fork on their fork_limit least reliable bits and
+    SPC nodes on their fork_limit least reliable bits besides the parity bit; the remaining bits take the hard
+    decision, which does not change the path metric. With list_size - 1 forks no performance is lost. When the limit
+    is not smaller than the node size, every bit is forked in index order.
+
+    G-REP nodes fork over their rightmost descendant, decoded from the sum of the repeated alphas, and G-PC nodes
+    over each of their interleaved SPC codes in turn.
+
+    :param n: tree depth
+    :param list_size: maximum list size
+    :param alphas: channel alphas
+    :param program: compiled tasks, from the task compiler
+    :param alpha_array: alphas workspace, one row per path
+    :param beta_array: betas workspace, one row per path
+    :param alpha_pointer_array: alpha pointers workspace, one row per path and one column per tree slot
+    :param beta_pointer_array: beta pointers workspace, one row per path and one column per tree slot
+    :param metrics: path metrics workspace, one row per path
+    :param fork_limit: maximum number of forked bits per rate-1 or SPC node
+    :param llr_max: saturation value of the alphas
+    :return: decoded bits
+    """
+
+    alpha_array[0, :2 ** n] = alphas
+
+    # The uint8 pointers limit the number of paths to 256
+    alpha_pointer_array[:, :] = 0
+    beta_pointer_array[:, :] = 0
+
+    metrics[:, :] = 0
+    num_paths = 1
+
+    for task in program:
+        if task[0] == 1:
+
+            node_slot = task[9]
+            start_h = task[2]
+            size = task[6]
 
-            old_alpha_pointer_array = np.copy(alpha_pointer_array)
-            old_beta_pointer_array = np.copy(beta_pointer_array)
             for idx in range(num_paths):
-                path = int(metrics[idx, 1])
-                metrics[idx, 1] = idx
+                metrics[idx, 1] = alpha_pointer_array[idx, node_slot]
 
-                alpha_pointer_array[idx, :] = old_alpha_pointer_array[path, :]
-                beta_pointer_array[idx, :] = old_beta_pointer_array[path, :]
-                beta_pointer_array[idx, parent_node] = idx
-                beta_array[idx, start_h:start_h + size] = node_betas[idx, :]
+            # Computed for every workspace row, and accessed through the alpha row of each path
+            node_betas, entry_paths, num_paths = list_rate_1_forks(alpha_array[:, start_h:start_h + size], metrics,
+                                                                   num_paths, list_size, fork_limit)
 
-        elif task[1] == 2:
+            list_update_paths(node_betas, entry_paths, num_paths, metrics, alpha_pointer_array, beta_pointer_array,
+                              beta_array, task)
 
-            parent_node = int(task[0])
-            start_h = address_list[parent_node, 0]
-            size = address_list[parent_node, 5]
+        elif task[0] == 2:
+
+            node_slot = task[9]
+            start_h = task[2]
+            size = task[6]
 
             num_final_paths = min(2 * num_paths, list_size)
             next_metrics = np.zeros((2 * num_paths, 3), dtype=np.float64)
 
             for idx in range(num_paths):
-                alpha_path = int(alpha_pointer_array[int(metrics[idx, 1]), parent_node])
-                alphas = alpha_array[alpha_path, start_h:start_h + size]
+                alpha_path = int(alpha_pointer_array[idx, node_slot])
+                alphas = alpha_array[alpha_path, start_h:start_h + size].astype(np.float64)
                 metric = metrics[idx, 0]
 
                 pm0 = metric + 1 / 2 * np.sum(np.abs(alphas) - alphas)
@@ -755,7 +1909,7 @@ def sscl_spc_decode(n, list_size, alphas, tasks, address_list):
                 next_metrics[2 * idx, :] = [idx, 0.0, pm0]
                 next_metrics[2 * idx + 1, :] = [idx, 1.0, pm1]
 
-            metrics_order = np.argsort(next_metrics[:, 2])[:num_final_paths]
+            metrics_order = path_selection(next_metrics[:, 2], num_final_paths)
             final_paths = next_metrics[metrics_order]
 
             old_alpha_pointer_array = np.copy(alpha_pointer_array)
@@ -767,150 +1921,145 @@ def sscl_spc_decode(n, list_size, alphas, tasks, address_list):
 
                 alpha_pointer_array[idx, :] = old_alpha_pointer_array[old_idx, :]
                 beta_pointer_array[idx, :] = old_beta_pointer_array[old_idx, :]
-                beta_pointer_array[idx, parent_node] = idx
+                beta_pointer_array[idx, node_slot] = idx
                 beta_array[idx, start_h:start_h + size] = value * np.ones(size, dtype=np.uint8)
 
                 metrics[idx, :] = [metric, idx]
 
             num_paths = num_final_paths
 
-        elif task[1] == 3:
-
-            parent_node = int(task[0])
-            start_h = address_list[parent_node, 0]
-            size = address_list[parent_node, 5]
-            node_betas = np.zeros((list_size, size), dtype=np.uint8)
-
-            node_alphas = alpha_array[:, start_h:start_h + size]
+        elif task[0] == 3:
 
-            idx_min = np.argmin(np.abs(node_alphas), axis=-1).flatten()
-            parity_array = np.ones(node_alphas.shape, dtype=np.uint8)
-            parity_array[node_alphas >= 0] = 0
-            parity = np.sum(parity_array, axis=-1) % 2
-            min_alphas = np.min(np.abs(node_alphas), axis=-1)
-            acc_parity = np.zeros(list_size, dtype=np.uint8)
+            node_slot = task[9]
+            start_h = task[2]
+            size = task[6]
 
             for idx in range(num_paths):
-                metrics[idx, 0] = metrics[idx, 0] + min_alphas[idx] if parity[idx] else metrics[idx, 0]
+                metrics[idx, 1] = alpha_pointer_array[idx, node_slot]
 
-            for i in range(size - 1):
+            # Computed for every workspace row, and accessed through the alpha row of each path
+            node_betas, entry_paths, num_paths = list_spc_forks(alpha_array[:, start_h:start_h + size], metrics,
+                                                                num_paths, list_size, fork_limit)
 
-                num_final_paths = min(2 * num_paths, list_size)
-                next_metrics = np.zeros((2 * num_paths, 5), dtype=np.float64)
+            list_update_paths(node_betas, entry_paths, num_paths, metrics, alpha_pointer_array, beta_pointer_array,
+                              beta_array, task)
 
-                for idx in range(num_paths):
-                    if idx_min[idx] <= i:
-                        i_bit = i + 1
+        elif task[0] == 4:
 
-                    else:
-                        i_bit = i
+            node_slot = task[9]
+            start_h = task[2]
+            size = task[6]
 
-                    alpha_path = alpha_pointer_array[int(metrics[idx, 1]), parent_node]
-                    alpha = alpha_array[alpha_path, start_h + i_bit]
-                    metric = metrics[idx, 0]
+            for idx in range(num_paths):
+                alpha_path = int(alpha_pointer_array[idx, node_slot])
+                alphas = alpha_array[alpha_path, start_h:start_h + size].astype(np.float64)
+                metrics[idx, 0] += 1 / 2 * np.sum(np.abs(alphas) - alphas)
 
-                    pm0 = metric + abs(alpha) \
-                        if alpha < 0 else metric
-                    pm1 = metric + abs(alpha) \
-                        if alpha >= 0 else metric
+        # TODO: sometimes, the node_path coincides with range()
+        elif task[0] == 5:
 
-                    next_metrics[2 * idx, :] = [idx, alpha_path, 0.0, pm0, i_bit]
-                    next_metrics[2 * idx + 1, :] = [idx, alpha_path, 1.0, pm1, i_bit]
+            node_slot = task[9]
+            left_child_slot = task[10]
+            right_child_slot = task[11]
 
-                metrics_order = np.argsort(next_metrics[:, 3])[:num_final_paths]
-                final_paths = next_metrics[metrics_order]
+            for i in range(num_paths):
+                left_beta_node_path = int(beta_pointer_array[i, left_child_slot])
+                right_beta_node_path = int(beta_pointer_array[i, right_child_slot])
 
-                # TODO: instead of copying idx, parity, ..., use the metrics[:, 1] path info to get the right element
-                old_node_betas = np.copy(node_betas)
-                old_idx_min = np.copy(idx_min)
-                old_parity = np.copy(parity)
-                old_min_alphas = np.copy(min_alphas)
-                old_acc_parity = np.copy(acc_parity)
-                for idx, path in enumerate(final_paths):
-                    old_idx = int(path[0])
-                    alpha_path = path[1]
-                    value = np.uint8(path[2])
-                    metric = path[3]
-                    i_bit = int(path[4])
+                betas_custom(beta_array[i, :], beta_array[left_beta_node_path, :], beta_array[right_beta_node_path, :],
+                             task)
 
-                    idx_min[idx] = old_idx_min[old_idx]
-                    parity[idx] = old_parity[old_idx]
-                    min_alphas[idx] = old_min_alphas[old_idx]
-                    acc_parity[idx] = (old_acc_parity[old_idx] + value) % 2
+                beta_pointer_array[i, node_slot] = i
 
-                    node_betas[idx, :] = old_node_betas[old_idx, :]
-                    node_betas[idx, i_bit] = value
+        elif task[0] == 6:
 
-                    metrics[idx, :] = [metric, alpha_path]
+            node_slot = task[9]
+            left_child_slot = task[10]
 
-                num_paths = num_final_paths
+            for i in range(num_paths):
+                parent_node_path = int(alpha_pointer_array[i, node_slot])
+                alpha_left_custom(alpha_array[parent_node_path, :], alpha_array[i, :], task)
 
-            for idx, parity in enumerate(acc_parity[:num_paths]):
-                node_betas[idx, idx_min[idx]] = parity % 2
+                alpha_pointer_array[i, left_child_slot] = i
 
-            old_alpha_pointer_array = np.copy(alpha_pointer_array)
-            old_beta_pointer_array = np.copy(beta_pointer_array)
-            for idx in range(num_paths):
-                path = int(metrics[idx, 1])
-                metrics[idx, 1] = idx
+        elif task[0] == 7:
 
-                alpha_pointer_array[idx, :] = old_alpha_pointer_array[path, :]
-                beta_pointer_array[idx, :] = old_beta_pointer_array[path, :]
-                beta_pointer_array[idx, parent_node] = idx
-                beta_array[idx, start_h:start_h + size] = node_betas[idx, :]
+            node_slot = task[9]
+            left_child_slot = task[10]
+            right_child_slot = task[11]
 
-        elif task[1] == 4:
+            for i in range(num_paths):
+                parent_alpha_node_path = alpha_pointer_array[i, node_slot]
+                left_beta_node_path = int(beta_pointer_array[i, left_child_slot])
 
-            parent_node = task[0]
-            start_h = address_list[parent_node, 0]
-            size = address_list[parent_node, 5]
+                alpha_right_custom(alpha_array[int(parent_alpha_node_path), :], alpha_array[i, :],
+                                   beta_array[left_beta_node_path, :], task, llr_max)
 
-            for idx in range(num_paths):
-                alpha_path = int(alpha_pointer_array[idx, parent_node])
-                alphas = alpha_array[alpha_path, start_h:start_h + size]
-                metrics[idx, 0] += 1 / 2 * np.sum(np.abs(alphas) - alphas)
+                alpha_pointer_array[i, right_child_slot] = i
 
-        # TODO: sometimes, the node_path coincides with range()
-        elif task[1] == 5:
+        elif task[0] == 8:
 
-            parent_node = int(task[0])
-            left_child_node = int(2 * parent_node + 1)
-            right_child_node = int(2 * parent_node + 2)
+            node_slot = task[9]
+            start_h = task[2]
+            size = task[6]
+            child_size = task[12]
 
-            for i in range(num_paths):
-                left_beta_node_path = int(beta_pointer_array[i, left_child_node])
-                right_beta_node_path = int(beta_pointer_array[i, right_child_node])
+            # The descendant alphas are the sums over the repetitions, and the metric of the best decision on each
+            # repeated bit is added beforehand
+            node_alphas = alpha_array[:, start_h:start_h + size].astype(np.float64)
+            child_alphas = np.zeros((list_size, child_size), dtype=np.float64)
+            for block in range(0, size, child_size):
+                child_alphas += node_alphas[:, block: block + child_size]
 
-                betas_custom(beta_array[i, :], beta_array[left_beta_node_path, :], beta_array[right_beta_node_path, :],
-                             address_list, parent_node)
+            base_metrics = 1 / 2 * (np.sum(np.abs(node_alphas), axis=-1) - np.sum(np.abs(child_alphas), axis=-1))
 
-                beta_pointer_array[i, parent_node] = i
+            for idx in range(num_paths):
+                alpha_path = alpha_pointer_array[idx, node_slot]
+                metrics[idx, 0] += base_metrics[alpha_path]
+                metrics[idx, 1] = alpha_path
 
-        elif task[1] == 6:
+            if task[13] == 3:
+                child_betas, entry_paths, num_paths = list_spc_forks(child_alphas, metrics, num_paths, list_size,
+                                                                     fork_limit)
 
-            parent_node = task[0]
-            child_node = int(2 * parent_node + 1)
+            else:
+                child_betas, entry_paths, num_paths = list_rate_1_forks(child_alphas, metrics, num_paths, list_size,
+                                                                        fork_limit)
 
-            for i in range(num_paths):
-                parent_node_path = int(alpha_pointer_array[i, parent_node])
-                alpha_left_custom(alpha_array[parent_node_path, :], alpha_array[i, :], address_list, parent_node)
+            node_betas = np.zeros((num_paths, size), dtype=np.uint8)
+            for block in range(0, size, child_size):
+                node_betas[:, block: block + child_size] = child_betas
 
-                alpha_pointer_array[i, child_node] = i
+            list_update_paths(node_betas, entry_paths, num_paths, metrics, alpha_pointer_array, beta_pointer_array,
+                              beta_array, task)
 
-        elif task[1] == 7:
+        elif task[0] == 9:
 
-            parent_node = task[0]
-            left_child_node = 2 * parent_node + 1
-            right_child_node = int(2 * parent_node + 2)
+            node_slot = task[9]
+            start_h = task[2]
+            size = task[6]
+            child_size = task[12]
 
-            for i in range(num_paths):
-                parent_alpha_node_path = alpha_pointer_array[i, parent_node]
-                left_beta_node_path = int(beta_pointer_array[i, left_child_node])
+            for idx in range(num_paths):
+                metrics[idx, 1] = alpha_pointer_array[idx, node_slot]
 
-                alpha_right_custom(alpha_array[int(parent_alpha_node_path), :], alpha_array[i, :],
-                                   beta_array[left_beta_node_path, :], address_list, parent_node)
+            # The bits spaced by child_size form independent SPC codes, decoded one after the other
+            node_betas = np.zeros((list_size, size), dtype=np.uint8)
+            entry_paths = np.arange(list_size).astype(np.uint8)
+            for j in range(child_size):
+                code_betas, code_entry_paths, num_paths = list_spc_forks(
+                    alpha_array[:, start_h + j: start_h + size: child_size], metrics, num_paths, list_size,
+                    fork_limit)
+
+                old_node_betas = np.copy(node_betas)
+                old_entry_paths = np.copy(entry_paths)
+                for idx in range(num_paths):
+                    node_betas[idx, :] = old_node_betas[code_entry_paths[idx], :]
+                    node_betas[idx, j: size: child_size] = code_betas[idx, :]
+                    entry_paths[idx] = old_entry_paths[code_entry_paths[idx]]
 
-                alpha_pointer_array[i, right_child_node] = i
+            list_update_paths(node_betas, entry_paths, num_paths, metrics, alpha_pointer_array, beta_pointer_array,
+                              beta_array, task)
 
     # Outputting the whole array enables the use of CRC list decoding
     return beta_array, metrics, num_paths
@@ -12,19 +12,30 @@ try:
     from .polarfuncs_compiled import (
         fl,
         fr,
+        saturate,
         address_list_factory,
+        compact_address_list_factory,
         ssc_node_classifier,
         fast_ssc_node_classifier,
+        extended_node_classifier,
         alpha_left,
         alpha_right,
         betas,
         alpha_left_custom,
         alpha_right_custom,
         betas_custom,
+        path_selection,
         encode,
+        encode_batch,
+        encode_packed,
         ssc_decode,
         fast_ssc_decode,
-        sscl_spc_decode
+        fast_ssc_flip_decode,
+        fast_ssc_decode_batch,
+        sscl_spc_decode,
+        genie_sc_decode_batch,
+        scan_decode_batch,
+        bp_decode_batch
     )
 
 
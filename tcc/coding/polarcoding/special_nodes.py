@@ -0,0 +1,60 @@
+"""
+Library of special nodes for the Fast-SSC decoder. The list decoders only take the G-REP and G-PC nodes.
+
+Each special node is recognized by a rule of the extended node classifier, scheduled under its own operation code and
+decoded by a kernel of the decoding functions, without traversing its subtree. Adding a node type takes its
+classification rule, its kernels and an entry on SPECIAL_NODES.
+
+The Type-I and Type-II nodes are G-REP nodes, and the Type-III nodes are G-PC nodes, so they share their kernels and
+the 'g-rep' and 'g-pc' names take them too. Only these nodes have list decoding kernels: the Type-IV, Type-V and
+REP-SPC nodes have none, and are only decoded by the Fast-SSC decoder.
+
+Created on 18/10/2026 17:20
+"""
+
+from collections import namedtuple
+
+SpecialNode = namedtuple('SpecialNode', ['node_types', 'opcode', 'list_decoding'])
+
+# Extended node types, from extended_node_classifier, and operation code, from the schedulers
+SPECIAL_NODES = {
+    'type-i': SpecialNode(node_types=(5, ), opcode=8, list_decoding=True),
+    'type-ii': SpecialNode(node_types=(6, ), opcode=8, list_decoding=True),
+    'type-iii': SpecialNode(node_types=(7, ), opcode=9, list_decoding=True),
+    'type-iv': SpecialNode(node_types=(8, ), opcode=10, list_decoding=False),
+    'type-v': SpecialNode(node_types=(9, ), opcode=11, list_decoding=False),
+    'rep-spc': SpecialNode(node_types=(10, ), opcode=12, list_decoding=False),
+    'g-rep': SpecialNode(node_types=(5, 6, 11), opcode=8, list_decoding=True),
+    'g-pc': SpecialNode(node_types=(7, 12), opcode=9, list_decoding=True)
+}
+
+
+def special_opcodes(special_nodes, list_decoding=False):
+    """
+    Get the operation codes of the chosen special nodes
+
+    :param special_nodes: names of the special nodes, or 'all' for every node
+    :param list_decoding: whether the nodes are decoded by a list decoder
+    :return: dictionary from the extended node types to their operation codes
+    """
+
+    if special_nodes == 'all':
+        if list_decoding:
+            raise ValueError("The type-iv, type-v and rep-spc nodes are not available on list decoders, please name "
+                             "the special nodes instead of 'all'.")
+
+        special_nodes = list(SPECIAL_NODES)
+
+    opcodes = {}
+    for name in special_nodes:
+        if name not in SPECIAL_NODES:
+            raise ValueError("Invalid special node: {}".format(name))
+
+        node = SPECIAL_NODES[name]
+        if list_decoding and not node.list_decoding:
+            raise ValueError("The {} node is not available on list decoders.".format(name))
+
+        for node_type in node.node_types:
+            opcodes[node_type] = node.opcode
+
+    return opcodes
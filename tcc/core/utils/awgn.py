@@ -22,8 +22,8 @@ class AWGN(object):
 
     def __call__(self, signal, **kwargs):
 
-        # Number of samples to take average on
-        num_samples = len(signal)
+        # Number of samples to take average on, over every frame of a batch of frames
+        num_samples = signal.size
 
         # Compute the modulated symbol energy Es
         if 'signal_power' in kwargs.keys():
@@ -58,7 +58,7 @@ class AWGN(object):
             raise ValueError('Either the SNR or variance must be set')
 
         std_dev = np.sqrt(self.variance)
-        n = std_dev * (self.rng.normal(size=num_samples) + 1j * self.rng.normal(size=num_samples))
+        n = std_dev * (self.rng.normal(size=signal.shape) + 1j * self.rng.normal(size=signal.shape))
 
         return signal + n
 
@@ -0,0 +1,69 @@
+"""
+Adaptive number of frames per simulation job.
+
+Created on 18/10/2026 18:40
+"""
+
+
+class ChunkSize(object):
+    """
+    Keeps the number of frames per job close to a target job duration, following a moving average of the time per
+    frame measured by the workers.
+    """
+
+    # Weight of the last measurement on the moving average
+    SMOOTHING = 0.5
+
+    def __init__(self, target_time, max_size=None, start_size=1):
+        """
+        :param target_time: desired duration of a job, in seconds
+        :param max_size: maximum number of frames per job, None for no limit
+        :param start_size: number of frames per job before the first measurement
+        """
+
+        if target_time <= 0:
+            raise ValueError("The target job duration should be positive.")
+
+        self.target_time = target_time
+        self.max_size = max_size
+        self.start_size = start_size
+
+        self.frame_time = None
+
+    def update(self, num_frames, elapsed):
+        """
+        :param num_frames: number of frames simulated
+        :param elapsed: time the workers took to simulate them, in seconds
+        :return: None
+        """
+
+        if num_frames == 0:
+            return
+
+        frame_time = elapsed / num_frames
+        if self.frame_time is None:
+            self.frame_time = frame_time
+
+        else:
+            self.frame_time += ChunkSize.SMOOTHING * (frame_time - self.frame_time)
+
+    def size(self, max_frames=None):
+        """
+        :param max_frames: maximum number of frames of the job, None for no limit
+        :return: number of frames of the next job
+        """
+
+        if self.frame_time is None:
+            size = self.start_size
+
+        elif self.frame_time > 0:
+            size = int(self.target_time / self.frame_time)
+
+        else:
+            size = self.max_size or self.start_size
+
+        for limit in [self.max_size, max_frames]:
+            if limit is not None:
+                size = min(size, limit)
+
+        return max(size, 1)
@@ -65,7 +65,8 @@ class Modulator(object):
 
 class Demodulator(object):
 
-    def __init__(self, constellation, demod_type='max-log', order=1, spread_factor=1):
+    def __init__(self, constellation, demod_type='max-log', order=1, spread_factor=1, llr_format='float64',
+                 llr_frac_bits=0):
 
         if constellation.phase_func[order] is not None:
             self.phase = True
@@ -81,6 +82,31 @@ class Demodulator(object):
         self.int2bit = int2bit_constructor(self.bits_p_symbol)
         self.demod_type = demod_type
 
+        # Fixed-point LLRs have llr_frac_bits fractional bits and saturate symmetrically
+        if llr_format == 'float64':
+            self.llr_dtype = None
+
+        elif llr_format in ['int8', 'int16']:
+            self.llr_dtype = np.dtype(llr_format)
+            self.llr_scale = 2 ** llr_frac_bits
+            self.llr_max = np.iinfo(self.llr_dtype).max
+
+        else:
+            raise ValueError("Invalid LLR format: {}".format(llr_format))
+
+    def quantize(self, llr):
+        """Quantize the LLRs to the fixed-point format.
+
+        :llr: float numpy.ndarray
+        :returns: integer numpy.ndarray, or the LLRs themselves on the float64 format
+        """
+
+        if self.llr_dtype is None:
+            return llr
+
+        quantized = np.clip(np.round(llr * self.llr_scale), -self.llr_max, self.llr_max)
+        return quantized.astype(self.llr_dtype)
+
     def __call__(self, symbols, variance=1):
         """Demodulate the symbol sequence in 'symbols'.
 
@@ -224,6 +250,10 @@ class Demodulator(object):
         else:
             raise ValueError("Invalid demodulation type: {}".format(self.demod_type))
 
+        # Quantize LLR's for fixed-point decoding
+        if self.demod_type != 'bits':
+            demod_output = self.quantize(demod_output)
+
         # Computes new shape
         new_shape = original_shape[:-1] + (-1, )
 
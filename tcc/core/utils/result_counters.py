@@ -0,0 +1,157 @@
+"""
+Simulation results shared between the workers and the main process.
+
+Created on 18/10/2026 19:30
+"""
+
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class ResultCounters(object):
+    """
+    Counters of events and totals on shared memory, indexed by (slot, category, worker).
+
+    Each worker only adds to its own counters, so no lock is needed, and the main process reads them summed over the
+    workers. A slot holds the results of one SNR point at a time. The workers signal each finished job on a
+    semaphore, which the main process waits on. The sum of the squared events of each frame is kept in the same way
+    and, optionally, a bounded histogram of the events per frame, with one array of bins per (slot, category, worker).
+    """
+
+    def __init__(self, categories, num_workers, num_slots, histogram_bins=None):
+        """
+        :param categories: names of the statistics categories
+        :param num_workers: number of workers
+        :param num_slots: number of SNR points simulated at once
+        :param histogram_bins: number of bins of the histograms of events per frame, the last bin counting the frames
+            with more events, None for no histogram
+        """
+
+        self.categories = list(categories)
+        self.shape = (num_slots, len(self.categories), num_workers)
+        self.histogram_bins = histogram_bins
+
+        # Events, totals and squared events per (slot, category, worker), then frames, jobs and elapsed time per
+        # (slot, worker), then the histogram bins per (slot, category, worker)
+        size = 8 * (3 * num_slots * len(self.categories) * num_workers + 3 * num_slots * num_workers)
+        if histogram_bins is not None:
+            size += 8 * num_slots * len(self.categories) * num_workers * histogram_bins
+        self.memory = shared_memory.SharedMemory(create=True, size=size)
+        self.finished = mp.Semaphore(0)
+
+        self._views()
+        for slot in range(num_slots):
+            self.reset(slot)
+
+    def _views(self):
+        num_slots, num_categories, num_workers = self.shape
+        counters_size = 8 * num_slots * num_categories * num_workers
+        jobs_size = 8 * num_slots * num_workers
+
+        self.events = np.ndarray(self.shape, dtype=np.int64, buffer=self.memory.buf)
+        self.totals = np.ndarray(self.shape, dtype=np.int64, buffer=self.memory.buf, offset=counters_size)
+        self.squares = np.ndarray(self.shape, dtype=np.int64, buffer=self.memory.buf, offset=2 * counters_size)
+        self.frames = np.ndarray((num_slots, num_workers), dtype=np.int64, buffer=self.memory.buf,
+                                 offset=3 * counters_size)
+        self.jobs = np.ndarray((num_slots, num_workers), dtype=np.int64, buffer=self.memory.buf,
+                               offset=3 * counters_size + jobs_size)
+        self.elapsed = np.ndarray((num_slots, num_workers), dtype=np.float64, buffer=self.memory.buf,
+                                  offset=3 * counters_size + 2 * jobs_size)
+
+        self.histograms = None
+        if self.histogram_bins is not None:
+            self.histograms = np.ndarray(self.shape + (self.histogram_bins, ), dtype=np.int64, buffer=self.memory.buf,
+                                         offset=3 * counters_size + 3 * jobs_size)
+
+    def __getstate__(self):
+        # The shared memory is attached again by name, and the arrays are rebuilt over it
+        state = self.__dict__.copy()
+        for key in ['events', 'totals', 'squares', 'frames', 'jobs', 'elapsed', 'histograms']:
+            del state[key]
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._views()
+
+    def add(self, slot, worker, drops, num_frames, elapsed, frame_events=()):
+        """
+        Add the results of a job, on the worker
+
+        :param slot: slot of the SNR point
+        :param worker: worker index
+        :param drops: tuples (category, num_events, num_total)
+        :param num_frames: number of frames of the job
+        :param elapsed: time the job took, in seconds
+        :param frame_events: tuples (category, events of each frame), whose squares are summed and, when keeping
+            histograms, binned
+        :return: None
+        """
+
+        for category, num_events, num_total in drops:
+            index = self.categories.index(category)
+            self.events[slot, index, worker] += num_events
+            self.totals[slot, index, worker] += num_total
+
+        for category, events in frame_events:
+            index = self.categories.index(category)
+            events = np.asarray(events, dtype=np.int64)
+            self.squares[slot, index, worker] += int(np.sum(events ** 2))
+
+            if self.histograms is not None:
+                bins = np.minimum(events, self.histogram_bins - 1)
+                self.histograms[slot, index, worker] += np.bincount(bins, minlength=self.histogram_bins)
+
+        self.frames[slot, worker] += num_frames
+        self.elapsed[slot, worker] += elapsed
+        self.jobs[slot, worker] += 1
+
+        self.finished.release()
+
+    def wait(self):
+        """
+        Wait for a job to finish, on the main process
+        """
+
+        self.finished.acquire()
+
+    def read(self, slot):
+        """
+        :param slot: slot of the SNR point
+        :return: events, totals and squared events of the frames per category, number of frames, elapsed time,
+            number of jobs and histograms per category (None without histograms), summed over the workers
+        """
+
+        histograms = None if self.histograms is None else np.sum(self.histograms[slot], axis=1)
+
+        return (np.sum(self.events[slot], axis=1), np.sum(self.totals[slot], axis=1),
+                np.sum(self.squares[slot], axis=1), int(np.sum(self.frames[slot])), float(np.sum(self.elapsed[slot])), int(np.sum(self.jobs[slot])), histograms)
+
+    def reset(self, slot):
+        """
+        Clear a slot for a new SNR point, while no job of the slot is pending
+        """
+
+        self.events[slot] = 0
+        self.totals[slot] = 0
+        self.squares[slot] = 0
+        self.frames[slot] = 0
+        self.elapsed[slot] = 0.0
+        self.jobs[slot] = 0
+
+        if self.histograms is not None:
+            self.histograms[slot] = 0
+
+    def close(self, unlink=False):
+        """
+        :param unlink: whether to also free the shared memory, which only the creating process should do
+        """
+
+        del self.events, self.totals, self.squares, self.frames, self.jobs, self.elapsed, self.histograms
+
+        self.memory.close()
+        if unlink:
+            self.memory.unlink()
@@ -24,62 +24,71 @@ class SnrManager(ABC):
         self.statistics = statistics
         self.config_cls = config_cls.config
 
-    def snr_stop(self):
-        max_stop = self._check_max()
-        min_stop = self._check_min()
-        min_num_events = self._check_min_events()
-        all_event = not self._check_any_empty()
+        # Number of SNR values that can be simulated at once
+        self.max_concurrent = 1
+
+    def snr_stop(self, snr_id=None):
+        snr_data = self.statistics.snr(snr_id)['data']
+
+        max_stop = self._check_max(snr_data)
+        min_stop = self._check_min(snr_data)
+        min_num_events = self._check_min_events(snr_data)
+        all_event = not self._check_any_empty(snr_data)
 
         return max_stop or (all_event and min_num_events and min_stop)
 
-    def _check_any_empty(self):
+    def _check_any_empty(self, snr_data):
         at_least_one_empty = False
         for counter_name in self.config_cls:
-            if not self.statistics.last_snr['data'][counter_name]['any']:
+            if not snr_data[counter_name]['any']:
                 at_least_one_empty = True
 
         return at_least_one_empty
 
-    def _check_all_empty(self):
+    def _check_all_empty(self, snr_data):
         all_empty = True
         for counter_name in self.config_cls:
-            if self.statistics.last_snr['data'][counter_name]['any']:
+            if snr_data[counter_name]['any']:
                 all_empty = False
 
         return all_empty
 
-    def _check_max(self):
+    def _check_max(self, snr_data):
         max_stop = False
         for counter_name in self.config_cls:
             if self.config_cls[counter_name].get('max_counter') is not None:
-                if np.sum(self.statistics.last_snr['data'][counter_name]['total']) >= \
-                        self.config_cls[counter_name]['max_counter']:
+                if snr_data[counter_name]['total'] >= self.config_cls[counter_name]['max_counter']:
                     max_stop = True
 
         return max_stop
 
-    def _check_min(self):
+    def _check_min(self, snr_data):
         min_stop = True
         for counter_name in self.config_cls:
             if self.config_cls[counter_name].get('min_counter') is not None:
-                if np.sum(self.statistics.last_snr['data'][counter_name]['total']) < \
-                        self.config_cls[counter_name]['min_counter']:
+                if snr_data[counter_name]['total'] < self.config_cls[counter_name]['min_counter']:
                     min_stop = False
 
         return min_stop
 
-    def _check_min_events(self):
+    def _check_min_events(self, snr_data):
         min_event_stop = True
         for counter_name in self.config_cls:
             if self.config_cls[counter_name].get('min_event_counter') is not None:
-                if np.sum(self.statistics.last_snr['data'][counter_name]['counter']) < \
-                        self.config_cls[counter_name]['min_event_counter']:
+                if snr_data[counter_name]['counter'] < self.config_cls[counter_name]['min_event_counter']:
                     min_event_stop = False
 
         return min_event_stop
 
     @abstractmethod
-    def sim_stop(self):
+    def sim_stop(self, snr_id=None):
+        pass
+
+    @abstractmethod
+    def stopped(self):
+        """
+        Whether the sweep ended after the last stopped SNR value, so SNR values started after it are discarded
+        """
         pass
 
     @abstractmethod
@@ -103,10 +112,16 @@ class SnrRangeManager(SnrManager):
         except KeyError:
             raise ValueError("For range type 'range', 'min_snr_db', 'max_snr_db', 'snr_db_step' should be set")
 
+        # The SNR values of a range don't depend on each other's results
+        self.max_concurrent = kwargs.get('max_concurrent_snr') or 1
+
         self.iter = self.Range(self.min_snr_db, self.max_snr_db, self.snr_db_step)
 
-    def sim_stop(self):
-        self.iter.stop = self._check_all_empty()
+    def sim_stop(self, snr_id=None):
+        self.iter.stop = self._check_all_empty(self.statistics.snr(snr_id)['data'])
+
+    def stopped(self):
+        return self.iter.stop
 
     def __iter__(self):
         return self.iter.__iter__()
@@ -154,30 +169,33 @@ class SnrDynamicManager(SnrManager):
 
         self.iter = self.Dynamic(self.start_db, self.min_step_db, self.start_level)
 
-    def sim_stop(self):
-        self.iter.any = not self._check_all_empty()
-        self.iter.min_stats = self._check_min_stats()
-        self.iter.max_stats = self._check_max_stats()
+    def sim_stop(self, snr_id=None):
+        snr_data = self.statistics.snr(snr_id)['data']
+
+        self.iter.any = not self._check_all_empty(snr_data)
+        self.iter.min_stats = self._check_min_stats(snr_data)
+        self.iter.max_stats = self._check_max_stats(snr_data)
         self.iter.lm = self.iter.level_min()
 
         self.iter.state_transition()
 
         self.iter.store_snr(self.iter.any)
 
-    def _check_min_stats(self):
+    def stopped(self):
+        return self.iter.state == "stop"
+
+    def _check_min_stats(self, snr_data):
         min_stats = True
         for counter_name in self.config_cls:
-            if self.statistics.last_snr['data'][counter_name]['rate'] < \
-                    self.config_cls[counter_name]['target_stats'][0]:
+            if snr_data[counter_name]['rate'] < self.config_cls[counter_name]['target_stats'][0]:
                 min_stats = False
 
         return min_stats
 
-    def _check_max_stats(self):
+    def _check_max_stats(self, snr_data):
         max_stats = True
         for counter_name in self.config_cls:
-            if self.statistics.last_snr['data'][counter_name]['rate'] > \
-                    self.config_cls[counter_name]['target_stats'][1]:
+            if snr_data[counter_name]['rate'] > self.config_cls[counter_name]['target_stats'][1]:
                 max_stats = False
 
         return max_stats
@@ -2,7 +2,6 @@ import numpy as np
 import datetime
 import os
 import logging
-from queue import Empty
 
 
 class Statistics:
@@ -17,7 +16,13 @@ class Statistics:
         self.extension = parameters.results_file_extension
         self.results_file_path = ""
         self.overwrite_output = parameters.overwrite_output
-        self.bit_stats_header = '{} \t Length \t Errors'.format(parameters.snr_unit)
+        # The length is the number of frames simulated
+        self.bit_stats_header = '{} \t Length (frames) \t Errors'.format(parameters.snr_unit)
+
+        # Optional histogram of the events per frame, the last bin counting the frames with more events
+        self.histogram_bins = parameters.histogram_bins
+        if self.histogram_bins is not None:
+            self.bit_stats_header += ' \t Histogram'
         self.rate_stats_header = '{} \t Error rate'.format(parameters.snr_unit)
 
         self.samples = []
@@ -27,6 +32,8 @@ class Statistics:
 
         self.key_list = []
 
+        # SNR points being simulated, by SNR id
+        self.snrs = dict()
         self.last_snr = None
 
     def add_categories(self, cat_list):
@@ -38,9 +45,10 @@ class Statistics:
             self.key_list.append(cat_tuple[0])
             self.write[cat_tuple[0]] = cat_tuple[1]
 
-    def add_snr(self, value):
+    def add_snr(self, value, snr_id=None):
         """
         :param value: SNR value
+        :param snr_id: SNR id, for simulating several SNR values at once
         :return: None
         """
 
@@ -48,36 +56,59 @@ class Statistics:
         self.last_snr['val'] = value
         self.last_snr['data'] = dict()
         for cat in self.key_list:
-            self.last_snr['data'][cat] = {'counter': [], 'total': [], 'any': False}
+            # Running sums over the drops: events, squared events of each frame, totals and frames (length)
+            self.last_snr['data'][cat] = {'counter': 0, 'counter_sq': 0, 'total': 0, 'length': 0, 'any': False}
+
+            if self.histogram_bins is not None:
+                self.last_snr['data'][cat]['histogram'] = np.zeros(self.histogram_bins, dtype=np.int64)
 
-    def update_stats(self, *args):
+        self.snrs[snr_id] = self.last_snr
+
+    def snr(self, snr_id=None):
         """
-        Update the statistics per drop for the last inserted SNR value
-        After adding an SNR, you can't update previous SNR's
-        :param args: Each parameter should be a tuple (category, num_events, num_total)
-        :return: None
+        :param snr_id: SNR id, or None for the last inserted SNR value
+        :return: SNR statistics
         """
-        for event_tuple in args:
-            current_snr = self.last_snr['data'][event_tuple[0]]
-            current_snr['counter'].append(event_tuple[1])
-            current_snr['total'].append(event_tuple[2])
 
-    def gen_stats(self):
-        for key in self.key_list:
-            current_snr = self.last_snr['data'][key]
-            current_snr['length'] = len(current_snr['total'])
+        return self.last_snr if snr_id is None else self.snrs[snr_id]
 
-            if any(current_snr['counter']):
-                current_snr['any'] = True
+    def remove_snr(self, snr_id):
+        """
+        Stop keeping an SNR value, after generating its rate or when discarding it
+        :param snr_id: SNR id
+        :return: None
+        """
 
-    def update_from_queue(self, queue):
-        while True:
-            try:
-                args = queue.get(block=False)
-                self.update_stats(*args)
+        self.snrs.pop(snr_id, None)
 
-            except Empty:
-                break
+    def update_stats(self, *args, num_frames=1, snr_id=None, counter_sq=None, histograms=None):
+        """
+        Update the statistics per drop for an SNR value being simulated
+        After generating its rate, you can't update an SNR
+        :param args: Each parameter should be a tuple (category, num_events, num_total)
+        :param num_frames: number of frames of the drop
+        :param snr_id: SNR id, or None for the last inserted SNR value
+        :param counter_sq: dictionary from the categories to the sums of the squared events of each frame of the drop,
+            None when each drop is a single frame
+        :param histograms: dictionary from the categories to the histograms of events per frame of the drop
+        :return: None
+        """
+        snr_data = self.snr(snr_id)['data']
+        for category, num_events, num_total in args:
+            current_snr = snr_data[category]
+            current_snr['counter'] += int(num_events)
+            current_snr['counter_sq'] += int(num_events) ** 2 if counter_sq is None else int(counter_sq[category])
+            current_snr['total'] += int(num_total)
+            current_snr['length'] += num_frames
+
+            if self.histogram_bins is not None and histograms is not None:
+                current_snr['histogram'] += histograms[category]
+
+    def gen_stats(self, snr_id=None):
+        snr_data = self.snr(snr_id)['data']
+        for key in self.key_list:
+            current_snr = snr_data[key]
+            current_snr['any'] = current_snr['counter'] > 0
 
     def write_to_file(self):
         """
@@ -94,10 +125,11 @@ class Statistics:
                     for snr in self.samples:
                         np.savetxt(file, np.array([snr['val']]).reshape((1, -1)),
                                    fmt='%.4f', delimiter='', newline='\t')
-                        np.savetxt(file, np.array([snr['data'][stats_name]['length']]).reshape((1, -1)),
-                                   fmt='%d', delimiter='', newline='\t')
-                        np.savetxt(file, np.array(snr['data'][stats_name]['counter']).reshape((1, -1)),
-                                   fmt='%d', delimiter='\t')
+                        counters = [snr['data'][stats_name]['length'], snr['data'][stats_name]['counter']]
+                        if self.histogram_bins is not None:
+                            counters.extend(snr['data'][stats_name]['histogram'])
+
+                        np.savetxt(file, np.array(counters).reshape((1, -1)), fmt='%d', delimiter='\t')
 
         for stats_name in self.key_list:
             rate_file_name = os.path.join(self.results_file_path, stats_name + self.extension)
@@ -110,17 +142,18 @@ class Statistics:
                     np.savetxt(file, np.array(snr['data'][stats_name]['rate']).reshape((1, -1)),
                                fmt='%.6e', delimiter='\t')
 
-    def gen_rate(self):
+    def gen_rate(self, snr_id=None):
+        snr = self.snr(snr_id)
         for cat in self.key_list:
-            snr_data = self.last_snr['data'][cat]
-            sum_total = np.sum(snr_data['total'])
+            snr_data = snr['data'][cat]
+            sum_total = snr_data['total']
             if sum_total:
-                snr_data['rate'] = np.sum(snr_data['counter']) / sum_total
+                snr_data['rate'] = snr_data['counter'] / sum_total
 
             else:
                 snr_data['rate'] = -1
 
-        self.samples.append(self.last_snr)
+        self.samples.append(snr)
         self._sort_snr()
         self.write_to_file()
 
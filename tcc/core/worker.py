@@ -4,19 +4,17 @@ import logging
 
 class Worker(ABC):
 
-    def __init__(self, rng, results_queue, shutdown_event, job_queue):
+    def __init__(self, rng, results, job_queue, worker_id):
 
         self.logger = logging.getLogger(__name__)
 
         # Set up the simulation objects
         self.rng = rng
 
-        # Queue
-        self.results_queue = results_queue
+        # Shared result counters and job queue
+        self.results = results
         self.job_queue = job_queue
-
-        # Shutdown
-        self.shutdown_event = shutdown_event
+        self.worker_id = worker_id
 
     @abstractmethod
     def run(self):
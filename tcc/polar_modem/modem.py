@@ -17,26 +17,33 @@ from tcc.core.utils.awgn import AWGN
 
 
 class Modem:
-    def __init__(self, parameters, rng):
+    def __init__(self, parameters, rng, rel_idx=None, construction_cache=None):
+        """
+        :param parameters: simulation parameters
+        :param rng: random generator of the transmitted bits
+        :param rel_idx: reliability indexes of the code, the base design if None
+        :param construction_cache: ConstructionCache the base design is read from, when rel_idx is None
+        """
+
         # Parameters
         self.K = parameters.k
         self.n = parameters.n
         self.rate = self.K / 2 ** self.n
-        self._snr = parameters.base_design_snr
-        self.construction_method = parameters.construction_method
-        self.frozen_design = parameters.frozen_design
+        self.snr = parameters.base_design_snr
 
         # Objects
         self.rng = rng
         self.mod = Modulator(PolarConstellation(), parameters.bits_p_symbol)
-        self.dem = Demodulator(PolarConstellation(), parameters.demod_type, parameters.bits_p_symbol)
+        self.dem = Demodulator(PolarConstellation(), parameters.demod_type, parameters.bits_p_symbol,
+                               llr_format=parameters.llr_format, llr_frac_bits=parameters.llr_frac_bits)
 
-        base_design_snr = AWGN.unit_conversion(parameters.base_design_snr, parameters.bits_p_symbol,
-                                               parameters.k / 2 ** parameters.n, parameters.snr_unit,
-                                               'EsN0_dB')
-        rel_idx = construction(parameters.construction_method, parameters.n, base_design_snr)
+        # Simulations design the code once on the main process, and hand the reliability indexes to their workers
+        if rel_idx is None:
+            rel_idx = Modem.base_design(parameters, construction_cache)
+
+        crc_stopping = parameters.decoding_algorithm in ['bp', 'scan'] and parameters.early_stopping == 'crc'
 
-        if parameters.decoding_algorithm == 'sscl-spc-crc':
+        if parameters.decoding_algorithm in ['sscl-spc-crc', 'fast-sscl-crc', 'sc-flip', 'dsc-flip'] or crc_stopping:
             if parameters.crc_id:
                 self.crc = CRC(parameters.crc_id)
                 self.tx_size = self.K - self.crc.len_bit
@@ -53,37 +60,98 @@ class Modem:
                                  list_size=parameters.list_size,
                                  encoding_mode=parameters.encoding_mode,
                                  implementation_type=parameters.implementation_type,
-                                 crc=self.crc)
+                                 crc=self.crc,
+                                 memory_layout=parameters.memory_layout,
+                                 llr_format=parameters.llr_format,
+                                 special_nodes=parameters.special_nodes,
+                                 flip_attempts=parameters.flip_attempts,
+                                 flip_order=parameters.flip_order,
+                                 max_iterations=parameters.max_iterations,
+                                 early_stopping=parameters.early_stopping,
+                                 hard_decision_check=parameters.hard_decision_check)
 
         # Initialization
         self.txbits = None
         self.rxbits = None
 
+    @staticmethod
+    def construction_options(parameters):
+        if parameters.construction_method == 'monte-carlo':
+            # The seed is fixed, so that every worker designs the same code
+            return {'bits_p_symbol': parameters.bits_p_symbol,
+                    'demod_type': parameters.demod_type,
+                    'num_frames': parameters.monte_carlo_frames,
+                    'num_workers': parameters.num_workers,
+                    'implementation_type': parameters.implementation_type}
+
+        return {}
+
+    @staticmethod
+    def design(parameters, design_snr, cache=None):
+        return construction(parameters.construction_method, parameters.n, design_snr, cache,
+                            **Modem.construction_options(parameters))
+
+    @staticmethod
+    def base_design(parameters, cache=None):
+        base_design_snr = AWGN.unit_conversion(parameters.base_design_snr, parameters.bits_p_symbol,
+                                               parameters.k / 2 ** parameters.n, parameters.snr_unit,
+                                               'EsN0_dB')
+
+        return Modem.design(parameters, base_design_snr, cache)
+
     @property
-    def snr(self):
-        return self._snr
-
-    @snr.setter
-    def snr(self, value):
-        self._snr = value
-        if not self.frozen_design:
-            rel_idx = construction(self.construction_method, self.n, self._snr)
-            self.polar.rel_idx = rel_idx
-
-    def tx(self):
-        self.txbits = self.rng.integers(0, 2, self.tx_size, dtype=np.uint8)
+    def rel_idx(self):
+        return self.polar.rel_idx
+
+    @rel_idx.setter
+    def rel_idx(self, rel_idx):
+        self.polar.rel_idx = rel_idx
+
+    @property
+    def flip_extra_attempts(self):
+        """
+        Extra decoding attempts of the sc-flip and dsc-flip decoders over the frames decoded so far
+        """
+
+        return self.polar.decode.flip_extra_attempts
+
+    def tx(self, num_frames=None):
+        """
+        Transmit random frames
+
+        :param num_frames: number of frames, transmitted as the rows of a batch, or None for a single frame
+        :return: modulated symbols, shaped (symbols, ) or (num_frames, symbols)
+        """
+
+        shape = self.tx_size if num_frames is None else (num_frames, self.tx_size)
+        self.txbits = self.rng.integers(0, 2, shape, dtype=np.uint8)
         coded = self.polar.encode(self.txbits)
         modulated = self.mod(coded)
         return modulated
 
     def rx(self, signal, variance):
+        """
+        Receive the frames of tx
+
+        :param signal: received symbols, shaped as the output of tx
+        :param variance: noise variance
+        :return: detected bits, shaped (tx_size, ) or (num_frames, tx_size)
+        """
+
         demodulated = self.dem(signal, variance)
         rxbits = self.polar.decode(demodulated)
         return rxbits
 
     def compute_errors(self, rxbits):
-        errors = np.bitwise_xor(self.txbits, rxbits)
-        num_bit_errors = np.sum(errors)
-        num_frame_errors = 1 if num_bit_errors != 0 else 0
+        """
+        Count the errors of the frames of rx
+
+        :param rxbits: detected bits, shaped as the transmitted bits
+        :return: number of bit errors and number of frame errors, over every frame, and the bit errors of each frame
+        """
+
+        frame_bit_errors = np.count_nonzero(np.bitwise_xor(self.txbits, rxbits), axis=-1)
+        num_bit_errors = int(np.sum(frame_bit_errors))
+        num_frame_errors = int(np.count_nonzero(frame_bit_errors))
 
-        return num_bit_errors, num_frame_errors
+        return num_bit_errors, num_frame_errors, frame_bit_errors
@@ -11,7 +11,11 @@ import numpy as np
 
 from tcc.core.simulation import Simulation
 from tcc.polar_modem.polar_worker import PolarWorker
+from tcc.polar_modem.modem import Modem
+from tcc.coding.polarcoding.construction import ConstructionCache
 from tcc.core.utils.statistics import Statistics
+from tcc.core.utils.chunk_size import ChunkSize
+from tcc.core.utils.result_counters import ResultCounters
 from tcc.core.utils.snr_manager import snr_manager_builder, SnrConfig
 from tcc.core.utils.awgn import AWGN
 
@@ -23,14 +27,16 @@ class PolarSimulation(Simulation):
         # Logger
         self.logger = logging.getLogger(__name__)
 
-        # Shutdown
-        self.shutdown = mp.Event()
-
         # Statistics
         self.statistics = Statistics(parameters)
         self.statistics.add_categories([('ber', True),
                                         ('fer', True)])
 
+        # The average extra decoding attempts per frame of the flip decoders are logged and written as a rate
+        self.flip_decoding = parameters.decoding_algorithm in ['sc-flip', 'dsc-flip']
+        if self.flip_decoding:
+            self.statistics.add_categories([('extra_attempts', False)])
+
         # Get seeds
         if parameters.seed == -1:
             ss = np.random.SeedSequence()
@@ -42,13 +48,24 @@ class PolarSimulation(Simulation):
 
         random_generators = [np.random.default_rng(s) for s in ss.spawn(parameters.num_workers)]
 
+        # The code is designed here and handed to the workers, which don't build it again. The daemonic workers
+        # couldn't start the Monte-Carlo construction processes anyway.
+        self.parameters = parameters
+        self.frozen_design = parameters.frozen_design
+        self.construction_cache = ConstructionCache(parameters.construction_cache_dir,
+                                                    parameters.construction_cache_size)
+
+        if parameters.construction_method == 'monte-carlo':
+            self.logger.info("Running the Monte-Carlo construction")
+
+        base_rel_idx = Modem.base_design(parameters, self.construction_cache)
+
         # Workers
         self.num_workers = parameters.num_workers
         self.frame_pack_size = parameters.frame_pack_size
-        self.job_queue = mp.JoinableQueue()
-        self.results_queue = mp.Queue()
-        self.workers = [PolarWorker(parameters, rng, self.results_queue, self.shutdown, self.job_queue)
-                        for rng in random_generators]
+        self.max_frame_counter = parameters.max_frame_counter
+        self.chunk_size = ChunkSize(parameters.job_target_time, parameters.max_job_frames)
+        self.job_queue = mp.Queue()
 
         # SNR Manager
         self.snr_config = SnrConfig({'counter_name': 'ber',
@@ -75,7 +92,15 @@ class PolarSimulation(Simulation):
                                                snr_db_step=parameters.snr_db_step,
                                                start_snr_db=start_snr_db,
                                                min_snr_step_db=parameters.min_snr_step_db,
-                                               start_level=parameters.start_dynamic_level)
+                                               start_level=parameters.start_dynamic_level,
+                                               max_concurrent_snr=parameters.max_concurrent_snr)
+
+        # Each SNR point being simulated takes a slot of the shared result counters
+        self.results = ResultCounters(self.statistics.key_list, self.num_workers, self.snr_manager.max_concurrent,
+                                      parameters.histogram_bins)
+        self.workers = [PolarWorker(parameters, rng, self.results, self.job_queue, worker_id, base_rel_idx,
+                                    self.snr_manager.max_concurrent)
+                        for worker_id, rng in enumerate(random_generators)]
 
     def run(self):
 
@@ -85,24 +110,190 @@ class PolarSimulation(Simulation):
             process.daemon = True
             process.start()
 
-        for snr_db, snr_id in self.snr_manager:
+        snr_points = iter(self.snr_manager)
+        more_points = True
+
+        # SNR points being simulated, in the order they were started
+        points = []
+        jobs_in_flight = 0
+
+        while points or more_points or jobs_in_flight:
+
+            # Start SNR points up to the number the SNR manager can run at once, each on a free slot
+            while more_points and len(points) < self.snr_manager.max_concurrent:
+                try:
+                    snr_db, snr_id = next(snr_points)
+
+                except StopIteration:
+                    more_points = False
+                    break
+
+                self.statistics.add_snr(snr_db, snr_id)
+                self.logger.info("Simulating SNR {}".format(snr_db))
+
+                slot = min(set(range(self.snr_manager.max_concurrent)) - {point.slot for point in points})
+                self.results.reset(slot)
 
-            self.statistics.add_snr(snr_db)
+                point = PolarSimulation.SnrPoint(snr_db, snr_id, slot)
+                if not self.frozen_design:
+                    point.rel_idx = Modem.design(self.parameters, snr_db, self.construction_cache)
 
-            self.logger.info("Simulating SNR {}".format(snr_db))
+                point.read = self.results.read(slot)
+                point.stop = self.snr_manager.snr_stop(snr_id)
+                points.append(point)
 
-            while not self.snr_manager.snr_stop():
-                for _ in range(self.frame_pack_size):
-                    self.job_queue.put((snr_db, snr_id))
+                points = self._commit(points)
+                more_points = more_points and not self.snr_manager.stopped()
 
-                self.job_queue.join()
+            # Keep the job queue topped up, so the workers never wait on the statistics
+            jobs_in_flight += self._dispatch(points, self.frame_pack_size - jobs_in_flight)
 
-                self.statistics.update_from_queue(self.results_queue)
-                self.statistics.gen_stats()
+            if not jobs_in_flight:
+                continue
 
-            # Generate statistics
-            self.statistics.gen_rate()
-            self.snr_manager.sim_stop()
+            # Blocks until a job finishes. Several jobs may have finished since, and they are all read at once; the
+            # results of discarded points are never read.
+            self.results.wait()
+            jobs_in_flight -= 1
+
+            for point in points:
+                self._read_results(point)
+
+            points = self._commit(points)
+            more_points = more_points and not self.snr_manager.stopped()
+
+        # Each worker stops on its shutdown sentinel
+        for _ in worker_processes:
+            self.job_queue.put(None)
 
-        self.shutdown.set()
         [process.join() for process in worker_processes]
+
+        self.results.close(unlink=True)
+
+    def _read_results(self, point):
+        """
+        Update the statistics of an SNR point with the results added to its slot since the last read, and check its
+        stop criteria
+
+        :param point: SNR point being simulated
+        :return: None
+        """
+
+        read = self.results.read(point.slot)
+        events, totals, squares, num_frames, elapsed, num_jobs, histograms = read
+        if num_jobs == point.read[5]:
+            return
+
+        last_events, last_totals, last_squares, last_frames, last_elapsed, last_jobs, last_histograms = point.read
+        drops = [(category, events[i] - last_events[i], totals[i] - last_totals[i])
+                 for i, category in enumerate(self.statistics.key_list)]
+        squares_drops = {category: squares[i] - last_squares[i] for i, category in enumerate(self.statistics.key_list)}
+
+        histogram_drops = None
+        if histograms is not None:
+            histogram_drops = {category: histograms[i] - last_histograms[i]
+                               for i, category in enumerate(self.statistics.key_list)}
+
+        self.statistics.update_stats(*drops, num_frames=num_frames - last_frames, snr_id=point.snr_id,
+                                     counter_sq=squares_drops, histograms=histogram_drops)
+        self.chunk_size.update(num_frames - last_frames, elapsed - last_elapsed)
+
+        point.jobs -= num_jobs - last_jobs
+        point.read = read
+
+        # The stop criteria are checked on every result
+        if not point.stop:
+            self.statistics.gen_stats(point.snr_id)
+            point.stop = self.snr_manager.snr_stop(point.snr_id)
+
+    def _dispatch(self, points, num_jobs):
+        """
+        Put jobs for the running SNR points on the job queue, taking turns between them
+
+        :param points: SNR points being simulated
+        :param num_jobs: maximum number of jobs
+        :return: number of jobs put on the queue
+        """
+
+        num_dispatched = 0
+        running = [point for point in points if not point.stop]
+
+        while running and num_dispatched < num_jobs:
+            for point in list(running):
+                if num_dispatched == num_jobs:
+                    break
+
+                # Jobs don't take the SNR point past the maximum frame counter, and split the last frames between
+                # the workers
+                max_frames = None
+                if self.max_frame_counter is not None:
+                    remaining = self.max_frame_counter - point.frames
+                    if remaining <= 0:
+                        running.remove(point)
+                        continue
+
+                    max_frames = -(-remaining // self.num_workers)
+
+                num_frames = self.chunk_size.size(max_frames)
+                self.job_queue.put((point.snr_db, point.snr_id, point.slot, num_frames, point.rel_idx))
+
+                point.frames += num_frames
+                point.jobs += 1
+                num_dispatched += 1
+
+        return num_dispatched
+
+    def _commit(self, points):
+        """
+        Generate the statistics of the stopped SNR points with no jobs left, in the order they were started, as the
+        SNR manager decides on the following points from them. When the sweep ends, the points started after the
+        last committed one are discarded.
+
+        :param points: SNR points being simulated
+        :return: SNR points still being simulated
+        """
+
+        while points and points[0].stop and not points[0].jobs:
+            point = points.pop(0)
+
+            self.statistics.gen_rate(point.snr_id)
+            if self.flip_decoding:
+                self.logger.info("SNR {}: {:.4f} extra decoding attempts per frame".format(
+                    point.snr_db, self.statistics.snr(point.snr_id)['data']['extra_attempts']['rate']))
+
+            self.snr_manager.sim_stop(point.snr_id)
+            self.statistics.remove_snr(point.snr_id)
+
+            if self.snr_manager.stopped():
+                for discarded in points:
+                    self.statistics.remove_snr(discarded.snr_id)
+
+                return []
+
+        return points
+
+    class SnrPoint(object):
+        def __init__(self, snr_db, snr_id, slot):
+            """
+            Scheduling state of an SNR point
+
+            :param snr_db: SNR value
+            :param snr_id: SNR id, from the SNR manager
+            :param slot: slot of the shared result counters
+            """
+
+            self.snr_db = snr_db
+            self.snr_id = snr_id
+            self.slot = slot
+
+            # Reliability indexes designed for this SNR, None on a frozen design
+            self.rel_idx = None
+
+            # Results of the slot on the last read: events, totals, squared events, frames, elapsed time, jobs and
+            # histograms
+            self.read = None
+
+            # Frames put on the job queue, jobs without results and whether the stop criteria were met
+            self.frames = 0
+            self.jobs = 0
+            self.stop = False
@@ -1,4 +1,7 @@
-from queue import Empty
+from time import perf_counter
+from collections import OrderedDict
+
+import numpy as np
 
 from tcc.core.worker import Worker
 from tcc.core.utils.awgn import AWGN
@@ -7,47 +10,80 @@ from tcc.polar_modem.modem import Modem
 
 class PolarWorker(Worker):
 
-    def __init__(self, parameters, rng, results_queue, shutdown_event, job_queue):
+    def __init__(self, parameters, rng, results, job_queue, worker_id, rel_idx, max_concurrent=1):
         # Call super class initialization
-        super().__init__(rng, results_queue, shutdown_event, job_queue)
+        super().__init__(rng, results, job_queue, worker_id)
 
         self.parameters = parameters
-        self.snr_id = None
+        self.rel_idx = rel_idx
+        self.max_concurrent = max_concurrent
+
+        # The flip decoders also report their extra decoding attempts
+        self.flip_decoding = parameters.decoding_algorithm in ['sc-flip', 'dsc-flip']
 
     def run(self):
 
         # Initialize Modem and AWGN
-        modem = Modem(self.parameters, self.rng)
+        base_modem = Modem(self.parameters, self.rng, self.rel_idx)
         awgn = AWGN(self.parameters.bits_p_symbol, rng=self.rng, snr_unit=self.parameters.snr_unit,
-                    efficiency_factor=modem.rate)
+                    efficiency_factor=base_modem.rate)
+
+        # When the design isn't frozen, the jobs of the SNR points being simulated come interleaved, so each point
+        # keeps its own modem instead of switching the code of a single one on every job
+        modems = OrderedDict()
+
+        while True:
+            # Wait for the next simulation instruction, the shutdown sentinel being None
+            job = self.job_queue.get()
+            if job is None:
+                break
+
+            snr_db, snr_id, slot, num_frames, rel_idx = job
+
+            # Get the modem of the SNR point, with the code designed for it when the design isn't frozen
+            if rel_idx is None:
+                modem = base_modem
+
+            elif snr_id in modems:
+                modem = modems[snr_id]
+                modems.move_to_end(snr_id)
+
+            else:
+                # Once every point has its own modem, a new point takes over the least recently used one
+                if len(modems) < self.max_concurrent:
+                    modem = Modem(self.parameters, self.rng, rel_idx)
+
+                else:
+                    modem = modems.popitem(last=False)[1]
+                    modem.rel_idx = rel_idx
+
+                modems[snr_id] = modem
 
-        while not self.shutdown_event.is_set():
+            modem.snr = snr_db
 
-            try:
-                # Get simulation instruction
-                snr_db, snr_id = self.job_queue.get(block=False)
+            start_time = perf_counter()
+            start_attempts = modem.flip_extra_attempts if self.flip_decoding else 0
 
-                # Set SNR
-                if snr_id != self.snr_id:
-                    self.snr_id = snr_id
-                    modem.snr = snr_db
+            # The whole chunk goes through the chain at once, as a (num_frames, N) batch
+            tx_signal = modem.tx(num_frames)
 
-                # Transmit a single frame
-                tx_signal = modem.tx()
+            # Add noise to the transmitted signal
+            noise_symbols = awgn(tx_signal, snr=snr_db)
 
-                # Add noise to the transmitted signal
-                noise_symbols = awgn(tx_signal, snr=snr_db)
+            # Get the detected user data bits
+            detected_bits = modem.rx(noise_symbols, awgn.variance)
 
-                # Get the detected user data bits
-                detected_bits = modem.rx(noise_symbols, awgn.variance)
+            # Get statistics
+            bit_err_cnt, frame_err_cnt, frame_bit_errors = modem.compute_errors(detected_bits)
 
-                # Get statistics
-                bit_err_cnt, frame_err_cnt = modem.compute_errors(detected_bits)
+            elapsed = perf_counter() - start_time
 
-                # Send statistics
-                self.results_queue.put((('fer', frame_err_cnt, 1), ('ber', bit_err_cnt, modem.K)))
+            drops = [('fer', frame_err_cnt, num_frames), ('ber', bit_err_cnt, num_frames * modem.K)]
+            if self.flip_decoding:
+                drops.append(('extra_attempts', modem.flip_extra_attempts - start_attempts, num_frames))
 
-                self.job_queue.task_done()
+            # Add the statistics of the whole chunk to the shared counters, and its errors per frame to the histograms
+            self.results.add(slot, self.worker_id, drops, num_frames, elapsed,
+                             (('fer', (frame_bit_errors > 0).astype(np.int64)), ('ber', frame_bit_errors)))
 
-            except Empty:
-                pass
+        self.results.close()